@@ -0,0 +1,77 @@
+import os
+import json
+import tempfile
+
+from sectiondiff import GITHUB_WORKSPACE
+
+# Per-record hashes of the sections of the last exported revisions (not tracked in git, cached in CI)
+BASELINE_FILE = os.path.join(GITHUB_WORKSPACE, ".cache", "baseline", "manifest.json")
+
+# Bump whenever sectiondiff.record_hashes changes, so old manifests are ignored
+MANIFEST_VERSION = 1
+
+
+# Record hashes of section files keyed by git blob SHA, persisted between runs
+class BaselineManifest:
+    """
+    A section whose blob SHA is already in the manifest is not parsed again: its {ID: hash}
+    map is reused. Only the blobs looked up or stored during a run are kept when it is saved,
+    so the manifest always describes the last exported revisions.
+
+    Usage:
+
+        manifest = BaselineManifest()
+        changes = diff_revisions(base_rev, head_rev, hash_cache=manifest)
+        ... export ...
+        manifest.save({"base": base_rev, "head": head_rev})
+    """
+
+    def __init__(self, path=BASELINE_FILE):
+        self.path = path
+        self.blobs = {}
+        self.revisions = {}
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") == MANIFEST_VERSION:
+            self.blobs = manifest.get("blobs", {})
+            self.revisions = manifest.get("revisions", {})
+
+    # Function to get the {ID: hash} map of a blob, or None when it has to be hashed
+    def lookup(self, blob):
+        hashes = self.blobs.get(blob)
+        if hashes is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used.add(blob)
+        return hashes
+
+    # Function to remember the {ID: hash} map of a blob that was just hashed
+    def store(self, blob, hashes):
+        self.blobs[blob] = hashes
+        self.used.add(blob)
+
+    # Function to write the manifest atomically (temp file + rename), keeping only this run's blobs
+    def save(self, revisions):
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "revisions": revisions,
+            "blobs": {blob: self.blobs[blob] for blob in sorted(self.used)},
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return self.path
@@ -0,0 +1,84 @@
+import os
+import glob
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from cellformat import format_for_excel, format_from_excel
+from sectionstream import iter_records
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "repo-shopify-data")
+
+# Columns that hold numbers / booleans once a workbook has been through Excel
+NUMERIC_COLUMNS = ["Row #", "Width", "Height", "Image Width", "Image Height", "Product: Position",
+                   "Menu Item: Position"]
+BOOL_COLUMNS = ["Published", "Top Row", "Is Default"]
+
+
+# Legacy per-cell formatting, kept here as the reference implementation
+def legacy_format_for_excel(df):
+    for col in df.columns:
+        if pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].replace({True: 'TRUE', False: 'FALSE'})
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].apply(lambda x: f"{x:,.0f}" if pd.notna(x) and x == int(x) else f"{x:,.2f}")
+    return df
+
+
+def legacy_format_from_excel(df):
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            df[col] = df[col].apply(lambda x: True if x == 'TRUE' else (False if x == 'FALSE' else x))
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].apply(lambda x: f"{int(x):,}" if pd.notna(x) and x == int(x) else f"{x:,.2f}")
+    return df
+
+
+# Function to build all_sheet.xlsx-like sheets from repo-shopify-data, scaled up
+def build_sheets(scale):
+    rng = np.random.default_rng(0)
+    sheets = {}
+    for json_file in sorted(glob.glob(os.path.join(REPO_DIR, "*.json"))):
+        df = pd.DataFrame(list(iter_records(json_file)))
+        df = pd.concat([df] * scale, ignore_index=True)
+        for col in df.columns:
+            if col in NUMERIC_COLUMNS:
+                df[col] = rng.integers(0, 5_000_000, len(df)) * rng.choice([1.0, 1.0, 1.0, 0.25], len(df))
+            elif col in BOOL_COLUMNS:
+                df[col] = rng.random(len(df)) < 0.5
+        sheets[os.path.splitext(os.path.basename(json_file))[0]] = df
+    return sheets
+
+
+# Function to time a formatter over copies of every sheet
+def run(formatter, sheets):
+    copies = {name: df.copy() for name, df in sheets.items()}
+    started = time.perf_counter()
+    output = {name: formatter(df) for name, df in copies.items()}
+    return time.perf_counter() - started, output
+
+
+def same_output(left, right):
+    return all(left[name].astype(str).equals(right[name].astype(str)) for name in left)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vectorized vs per-cell Excel cell formatting.")
+    parser.add_argument("--scale", type=int, default=50, help="Copies of repo-shopify-data per sheet (default: 50)")
+    args = parser.parse_args()
+
+    sheets = build_sheets(args.scale)
+    rows = sum(len(df) for df in sheets.values())
+    print(f"📊 {len(sheets)} sheets, {rows:,} rows (scale x{args.scale})")
+
+    for label, legacy, vectorized in (
+        ("JSON -> Excel", legacy_format_for_excel, format_for_excel),
+        ("Excel -> JSON", legacy_format_from_excel, format_from_excel),
+    ):
+        legacy_time, legacy_output = run(legacy, sheets)
+        new_time, new_output = run(vectorized, sheets)
+        status = "identical" if same_output(legacy_output, new_output) else "DIFFERENT"
+        print(f"   {label}: per-cell {legacy_time * 1000:8.1f} ms | vectorized {new_time * 1000:8.1f} ms"
+              f" | x{legacy_time / new_time:.1f} | output {status}")
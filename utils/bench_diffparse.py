@@ -0,0 +1,89 @@
+import os
+import re
+import json
+import glob
+import shutil
+import time
+import argparse
+import tempfile
+import subprocess
+
+from diffparse import extract_ids
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "repo-shopify-data")
+
+SECTION_PATTERN = re.compile(r'^diff --git a/repo-shopify-data/([\w-]+)\.json')
+ID_PATTERN = re.compile(r'"ID":\s*"((?:gid://shopify/[\w/]+/)?\d+)"')
+CHANGE_BLOCK_PATTERN = re.compile(r'^@@')
+
+
+# Line-by-line scan of extractIdByPage_dev_triage.py, kept here as the reference implementation
+def legacy_scan(diff_file):
+    changed_ids = {}
+    current_section = None
+    inside_change_block = False
+    with open(diff_file, "r", encoding="utf-8") as file:
+        for line in file:
+            section_match = SECTION_PATTERN.search(line)
+            if section_match:
+                current_section = section_match.group(1)
+                changed_ids.setdefault(current_section, set())
+                inside_change_block = False
+            if CHANGE_BLOCK_PATTERN.search(line):
+                inside_change_block = True
+            if inside_change_block:
+                changed_ids[current_section].update(ID_PATTERN.findall(line))
+    return {section: sorted(ids) for section, ids in changed_ids.items() if ids}
+
+
+# Function to write a git diff of repo-shopify-data with every other record edited, repeated up to `megabytes`
+def build_diff(diff_file, megabytes):
+    with tempfile.TemporaryDirectory(prefix="bench-diffparse-") as scratch:
+        old_dir = os.path.join(scratch, "repo-shopify-data")
+        new_dir = os.path.join(scratch, "new", "repo-shopify-data")
+        shutil.copytree(REPO_DIR, old_dir)
+        os.makedirs(new_dir)
+        for json_file in sorted(glob.glob(os.path.join(REPO_DIR, "*.json"))):
+            with open(json_file, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            for record in records[::2]:
+                key = next(key for key in record if key not in ("ID", "Command"))
+                record[key] = f"{record[key]} (edited)"
+            with open(os.path.join(new_dir, os.path.basename(json_file)), "w") as f:
+                json.dump(records, f, indent=4)
+        diff = subprocess.run(["git", "diff", "--no-index", "repo-shopify-data", "new/repo-shopify-data"],
+                              cwd=scratch, capture_output=True).stdout
+
+    with open(diff_file, "wb") as f:
+        for _ in range(max(1, -(-megabytes * 1024 * 1024 // len(diff)))):
+            f.write(diff)
+    return diff_file
+
+
+# Function to time one extraction and report its throughput
+def run(label, extract, diff_file, reference=None):
+    started = time.perf_counter()
+    changed_ids = extract(diff_file)
+    elapsed = time.perf_counter() - started
+    megabytes = os.path.getsize(diff_file) / (1024 * 1024)
+    status = "" if reference is None else (" | same IDs" if changed_ids == reference else " | DIFFERENT IDs")
+    print(f"   {label:<24} {elapsed * 1000:9.1f} ms {megabytes / elapsed:8.1f} MB/s{status}")
+    return changed_ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the diff parser (MB/s) against the line-by-line scan.")
+    parser.add_argument("--diff-file", help="Existing diff to parse (default: a synthetic diff of repo-shopify-data)")
+    parser.add_argument("--megabytes", type=int, default=200, help="Size of the synthetic diff (default: 200)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes for the parallel run (default: all cores)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-diffparse-") as scratch:
+        diff_file = args.diff_file or build_diff(os.path.join(scratch, "changes.diff"), args.megabytes)
+        size = os.path.getsize(diff_file) / (1024 * 1024)
+        print(f"📊 {diff_file}: {size:,.1f} MB")
+
+        reference = run("line by line (legacy)", legacy_scan, diff_file)
+        run("diffparse, 1 process", extract_ids, diff_file, reference)
+        run(f"diffparse, {args.workers} processes", lambda path: extract_ids(path, args.workers), diff_file, reference)
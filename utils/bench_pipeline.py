@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+from changeset import write_changed_ids, extract_changed_records, write_change_jsons
+from metrics import StageRecorder, reset_peak_rss
+from sectiondiff import DATA_DIR, diff_revisions, changed_ids_by_section
+from snapshot import SNAPSHOT_DIR, prune_snapshots
+from synthcatalog import generate_catalog, mutate_catalog
+
+# Largest sheet Excel accepts (rows including the header)
+EXCEL_MAX_ROWS = 1_048_576
+
+
+# Function to run one stage and record its wall time, CPU time and peak memory
+def measure(recorder, stage_name, function, *args, **kwargs):
+    with recorder.stage(stage_name):
+        value = function(*args, **kwargs)
+    stage = recorder.stages[-1]
+    print(f"   {stage_name:<14} {stage.wall_seconds:9.3f} s {stage.peak_rss_mb:9.1f} MB")
+    return value
+
+
+def git(workspace, *args):
+    subprocess.run(["git", "-C", workspace] + list(args), check=True, stdout=subprocess.DEVNULL)
+
+
+# Function to create a throwaway repository holding a base catalog and a changed head commit
+def build_workspace(workspace, scale, fraction, stages):
+    data_dir = os.path.join(workspace, DATA_DIR)
+    git(workspace, "init", "-q")
+    git(workspace, "config", "user.name", "bench")
+    git(workspace, "config", "user.email", "bench@example.com")
+
+    catalog = measure(stages, "generate", generate_catalog, data_dir, scale)
+    git(workspace, "add", DATA_DIR)
+    git(workspace, "commit", "-q", "-m", "base")
+
+    changed_dir = os.path.join(workspace, ".bench-head")
+    expected = measure(stages, "change_set", mutate_catalog, data_dir, changed_dir, fraction)
+    for name in os.listdir(changed_dir):
+        os.replace(os.path.join(changed_dir, name), os.path.join(data_dir, name))
+    os.rmdir(changed_dir)
+    git(workspace, "add", DATA_DIR)
+    git(workspace, "commit", "-q", "-m", "head")
+    return catalog, expected
+
+
+# Function to compare the diff stage's result with the change set that was generated
+def check_changes(changes, expected):
+    mismatches = {}
+    for section, kinds in expected.items():
+        found = changes.get(section, {"added": [], "removed": [], "modified": []})
+        for kind, ids in kinds.items():
+            if set(found[kind]) != ids:
+                mismatches[f"{section}.{kind}"] = {"expected": len(ids), "found": len(found[kind])}
+    return mismatches
+
+
+# Function to benchmark the pipeline stages on one synthetic catalog size
+def run_scale(scale, fraction, excel=True, keep=False):
+    """
+    Stages mirror the scripts: 'diff' + 'ids' are extractIdByPage.py, 'extract' is
+    extract-changes-only.py, 'excel' is the change-only workbook and 'export' is the full
+    json_to_excel export (streaming, as in the workflow).
+    """
+    from excelexport import json_to_excel, records_to_excel
+
+    workspace = tempfile.mkdtemp(prefix=f"bench-x{scale}-")
+    stages = StageRecorder()
+    print(f"\n📊 Scale x{scale} ({workspace})")
+    try:
+        catalog, expected = build_workspace(workspace, scale, fraction, stages)
+
+        changes = measure(stages, "diff", diff_revisions, "HEAD~1", "HEAD", workspace)
+        changed_ids = measure(stages, "ids", changed_ids_by_section, changes)
+        write_changed_ids(os.path.join(workspace, "changes", "id-output", "changed_ids.txt"), changed_ids)
+        output_data = measure(stages, "extract", extract_changed_records, changed_ids, "HEAD", workspace)
+        write_change_jsons(os.path.join(workspace, "changes", "change-only-jsons"), output_data)
+
+        skipped = {}
+        if excel:
+            measure(stages, "excel", records_to_excel, output_data, os.path.join(workspace, "changes", "change-only-excel"))
+            largest = max(section["rows"] for section in catalog.values())
+            if largest + 1 > EXCEL_MAX_ROWS:
+                skipped["export"] = f"largest section has {largest:,} rows, over Excel's {EXCEL_MAX_ROWS:,} row limit"
+                print(f"   {'export':<14} skipped: {skipped['export']}")
+            else:
+                measure(stages, "export", json_to_excel, os.path.join(workspace, DATA_DIR),
+                        os.path.join(workspace, "final-matrixify-export"), streaming=True, snapshot_dir=SNAPSHOT_DIR)
+
+        return {
+            "scale": scale,
+            "rows": sum(section["rows"] for section in catalog.values()),
+            "bytes": sum(section["bytes"] for section in catalog.values()),
+            "sections": catalog,
+            "changed_ids": {section: len(ids) for section, ids in changed_ids.items()},
+            "diff_mismatches": check_changes(changes, expected),
+            "stages": {stage.pop("name"): stage for stage in stages.as_list()},
+            "skipped": skipped,
+        }
+    finally:
+        if keep:
+            print(f"   kept {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+            prune_snapshots()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the change pipeline on synthetic catalogs.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100],
+                        help="Catalog size multipliers (default: 10 100; x1000 writes ~2 GB of JSON)")
+    parser.add_argument("--fraction", type=float, default=0.01, help="Share of objects edited in the change set")
+    parser.add_argument("--no-excel", action="store_true", help="Skip the Excel stages")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workspaces")
+    parser.add_argument("--output", default="bench_pipeline.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    if not reset_peak_rss():
+        print("⚠️ Peak RSS cannot be reset on this platform; per-stage peaks are cumulative.")
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "fraction": args.fraction,
+        "results": [run_scale(scale, args.fraction, not args.no_excel, args.keep) for scale in args.scales],
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+    for result in report["results"]:
+        if result["diff_mismatches"]:
+            print(f"❌ x{result['scale']}: diff did not match the change set: {result['diff_mismatches']}")
+    print(f"\n📄 Results written to {args.output}")
@@ -0,0 +1,146 @@
+import os
+import random
+import hashlib
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from changeset import extract_changed_records, write_change_jsons, write_json_records
+from metrics import StageRecorder, reset_peak_rss
+from sectiondiff import DATA_DIR, diff_revisions, changed_ids_by_section
+from snapshot import prune_snapshots
+from textblobs import MIN_BLOB_CHARS, blob_path
+
+
+def git(workspace, *args):
+    subprocess.run(["git", "-C", workspace] + list(args), check=True, stdout=subprocess.DEVNULL)
+
+
+# Function to make a page body of about `size` bytes (a few shared templates, like a real theme)
+def page_body(number, size, templates, rng):
+    template = templates[number % len(templates)]
+    paragraphs = [f"<p>Page {number}: {rng.getrandbits(64):016x} {template}</p>"]
+    while sum(map(len, paragraphs)) < size:
+        paragraphs.append(f"<p>{template}</p>")
+    return "<div class=\"rte\">" + "\n".join(paragraphs) + "</div>"
+
+
+# Function to create a repository with an HTML-heavy Pages section and a head commit editing some bodies
+def build_workspace(workspace, pages, body_bytes, fraction, seed=0):
+    """
+    :return: Set of every Body HTML written (base and head), to remove their blobs afterwards
+    """
+    rng = random.Random(seed)
+    templates = [" ".join(f"word{rng.randrange(1000)}" for _ in range(40)) for _ in range(8)]
+    records = [{
+        "ID": str(100000000000 + number),
+        "Handle": f"page-{number}",
+        "Command": "MERGE",
+        "Title": f"Page {number}",
+        "Body HTML": page_body(number, body_bytes, templates, rng),
+        "Published": "true",
+    } for number in range(pages)]
+
+    pages_file = os.path.join(workspace, DATA_DIR, "Pages.json")
+    os.makedirs(os.path.dirname(pages_file))
+    git(workspace, "init", "-q")
+    git(workspace, "config", "user.name", "bench")
+    git(workspace, "config", "user.email", "bench@example.com")
+    write_json_records(pages_file, records)
+    git(workspace, "add", DATA_DIR)
+    git(workspace, "commit", "-q", "-m", "base")
+    bodies = {record["Body HTML"] for record in records}
+
+    for record in rng.sample(records, max(1, int(pages * fraction))):
+        if rng.random() < 0.5:
+            record["Body HTML"] = record["Body HTML"].replace("</div>", "<p>edited</p></div>")
+        else:
+            record["Title"] += " (edited)"
+    write_json_records(pages_file, records)
+    git(workspace, "commit", "-q", "-am", "head")
+    return bodies | {record["Body HTML"] for record in records}
+
+
+# Function to delete the blobs of the generated bodies from the blob store (and nothing else)
+def remove_blobs(bodies):
+    removed = 0
+    for body in bodies:
+        if len(body) >= MIN_BLOB_CHARS:
+            path = blob_path(hashlib.sha256(body.encode("utf-8")).hexdigest())
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+# Function to run extract -> delta -> write -> excel once and report wall time and peak memory per stage
+def run(workspace, text_blobs, workers):
+    from excelexport import records_to_excel
+    from fielddelta import build_delta
+
+    stages = StageRecorder()
+    changed_ids = changed_ids_by_section(diff_revisions("HEAD~1", "HEAD", workspace))
+    with stages.stage("extract") as stage:
+        new_data = extract_changed_records(changed_ids, "HEAD", workspace, workers, text_blobs)
+        old_data = extract_changed_records(changed_ids, "HEAD~1", workspace, workers, text_blobs)
+        # Text the change set holds between the stages (bodies or 72-character references)
+        stage.add(bytes=sum(len(value) for data in (new_data, old_data) for rows in data.values()
+                            for row in rows for value in row.values() if isinstance(value, str)))
+    with stages.stage("delta"):
+        output_data = build_delta(old_data, new_data)
+    with stages.stage("write"):
+        written = write_change_jsons(os.path.join(workspace, "changes", f"jsons-{text_blobs}"), output_data)
+    with stages.stage("excel"):
+        records_to_excel(new_data, os.path.join(workspace, "changes", f"excel-{text_blobs}"), workers)
+
+    outputs = {}
+    for file_path in written:
+        with open(file_path, "rb") as f:
+            outputs[os.path.basename(file_path)] = f.read()
+    return stages.as_list(), outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark change extraction with and without the text blob store.")
+    parser.add_argument("--pages", type=int, default=20000, help="Pages in the synthetic section (default: 20000)")
+    parser.add_argument("--body-kb", type=int, default=16, help="Size of each Body HTML in KB (default: 16)")
+    parser.add_argument("--fraction", type=float, default=0.05, help="Share of pages edited (default: 0.05)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for extract and Excel")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best one counts (default: 3)")
+    args = parser.parse_args()
+
+    if not reset_peak_rss():
+        print("⚠️ Peak RSS cannot be reset on this platform; per-stage peaks are cumulative.")
+
+    workspace = tempfile.mkdtemp(prefix="bench-textblobs-")
+    bodies = set()
+    try:
+        bodies = build_workspace(workspace, args.pages, args.body_kb * 1024, args.fraction)
+        size = os.path.getsize(os.path.join(workspace, DATA_DIR, "Pages.json")) / (1024 * 1024)
+        print(f"📊 {args.pages:,} pages, {size:,.1f} MB of JSON, {args.fraction:.0%} edited")
+
+        # Modes alternate and the best of the repeats counts: the first run also pays the pandas
+        # import and the first write of every blob
+        best, outputs = {}, {}
+        for _ in range(args.repeat):
+            for text_blobs in (False, True):
+                stages, outputs[text_blobs] = run(workspace, text_blobs, args.workers)
+                for stage in stages:
+                    kept = best.setdefault((text_blobs, stage["name"]), stage)
+                    kept["wall_seconds"] = min(kept["wall_seconds"], stage["wall_seconds"])
+                    kept["peak_rss_mb"] = min(kept["peak_rss_mb"], stage["peak_rss_mb"])
+
+        for text_blobs in (False, True):
+            print(f"\n   text blobs {'on' if text_blobs else 'off'} (best of {args.repeat})")
+            for (mode, name), stage in best.items():
+                if mode == text_blobs:
+                    held = f" {stage['bytes'] / (1024 * 1024):9.1f} MB of text held" if stage["bytes"] else ""
+                    print(f"   {name:<10} {stage['wall_seconds'] * 1000:9.1f} ms {stage['peak_rss_mb']:9.1f} MB peak{held}")
+
+        same = outputs[False] == outputs[True]
+        print(f"\n{'✅ Same' if same else '❌ Different'} change-only JSON files with and without blobs")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+        prune_snapshots()
+        print(f"🧹 Removed {remove_blobs(bodies):,} benchmark blobs")
@@ -0,0 +1,143 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import zipfile
+import tempfile
+
+from excelexport import BUILD_KEY_PROPERTY, FORMATTER_VERSION, render_rows, write_workbook_streaming
+from sectiondiff import GITHUB_WORKSPACE
+from sectionindex import file_sha256
+
+# Folder holding rendered sheets keyed by section content hash (not tracked in git)
+BUILD_CACHE_DIR = os.path.join(GITHUB_WORKSPACE, ".cache", "excel-build")
+
+# Bump when the cached sheet layout or the build key recipe changes
+CACHE_VERSION = 1
+
+
+# Function to combine (name, content hash) pairs and the formatter version into one build key
+def build_key(parts):
+    digest = hashlib.sha256(f"excel-build v{CACHE_VERSION} formatter v{FORMATTER_VERSION}\n".encode())
+    for name, content_hash in parts:
+        digest.update(f"{name}\t{content_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Function to hash every section file of a workbook
+def section_hashes(sections):
+    """
+    :param sections: Iterable of (sheet_name, json_file)
+    :return: List of (sheet_name, json_file, sha256) in input order
+    """
+    return [(sheet_name, json_file, file_sha256(json_file)) for sheet_name, json_file in sections]
+
+
+# Function to derive the build key of in-memory change records {section: records}
+def records_key(output_data):
+    parts = []
+    for section, records in output_data.items():
+        payload = json.dumps(records, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        parts.append((section, hashlib.sha256(payload).hexdigest()))
+    return build_key(parts)
+
+
+# Function to read the build key stamped into an exported workbook
+def workbook_build_key(excel_file):
+    try:
+        with zipfile.ZipFile(excel_file) as archive:
+            custom = archive.read("docProps/custom.xml").decode("utf-8")
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None  # Older exports carry no key and are simply rebuilt
+    match = re.search(rf'name="{BUILD_KEY_PROPERTY}"><vt:lpwstr>([0-9a-f]+)</vt:lpwstr>', custom)
+    return match.group(1) if match else None
+
+
+# Function to find an export in a folder that was built from exactly the same input
+def find_workbook(output_folder, key):
+    for excel_file in sorted(glob.glob(os.path.join(output_folder, "Export_*.xlsx")), reverse=True):
+        if workbook_build_key(excel_file) == key:
+            return excel_file
+    return None
+
+
+# Function to locate the rendered sheet of a section content hash
+def sheet_cache_path(content_hash, cache_dir=BUILD_CACHE_DIR):
+    return os.path.join(cache_dir, "sheets", f"{content_hash}-f{FORMATTER_VERSION}.jsonl")
+
+
+# Function to yield the rendered rows of a section, from the cache or by rendering (and caching) them
+def cached_rows(json_file, content_hash, cache_dir=BUILD_CACHE_DIR, snapshot_dir=None):
+    """
+    The cache file holds one JSON array per line: the column names, then one row per record.
+    A freshly rendered sheet only becomes visible in the cache once it was read to the end.
+
+    :param json_file: Path to the section file
+    :param content_hash: SHA-256 of the section file
+    :param cache_dir: Build cache folder
+    :param snapshot_dir: Render through the snapshots in this folder (see excelexport.render_rows)
+    :return: Generator shaped like excelexport.render_rows
+    """
+    cache_path = sheet_cache_path(content_hash, cache_dir)
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+        return
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for row in render_rows(json_file, snapshot_dir):
+                f.write(json.dumps(row, separators=(",", ":")) + "\n")
+                yield row
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+# Function to render one section into the cache (runs in a worker process with --workers)
+def warm_sheet(job):
+    json_file, content_hash, cache_dir, snapshot_dir = job
+    for _ in cached_rows(json_file, content_hash, cache_dir, snapshot_dir):
+        pass
+    return content_hash
+
+
+# Function to drop rendered sheets that no current section file refers to
+def prune(keep_hashes, cache_dir=BUILD_CACHE_DIR):
+    keep = {os.path.basename(sheet_cache_path(content_hash, cache_dir)) for content_hash in keep_hashes}
+    for cache_path in glob.glob(os.path.join(cache_dir, "sheets", "*.jsonl")):
+        if os.path.basename(cache_path) not in keep:
+            os.unlink(cache_path)
+
+
+# Function to write a workbook from section files, reusing rendered sheets of unchanged sections
+def write_cached_workbook(hashed_sections, output_excel_file, key, cache_dir=BUILD_CACHE_DIR, workers=1,
+                          snapshot_dir=None):
+    """
+    :param hashed_sections: List of (sheet_name, json_file, sha256), see section_hashes
+    :param output_excel_file: Path of the .xlsx file to create
+    :param key: Build key stamped into the workbook
+    :param cache_dir: Build cache folder
+    :param workers: Render uncached sections in this many processes before writing
+    :param snapshot_dir: Render uncached sections through the snapshots in this folder
+    :return: Number of sections served from the cache
+    """
+    missing = [(json_file, content_hash, cache_dir, snapshot_dir)
+               for _, json_file, content_hash in hashed_sections
+               if not os.path.exists(sheet_cache_path(content_hash, cache_dir))]
+    if workers > 1 and len(missing) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            list(pool.map(warm_sheet, missing))
+
+    sheets = ((sheet_name, cached_rows(json_file, content_hash, cache_dir, snapshot_dir))
+              for sheet_name, json_file, content_hash in hashed_sections)
+    write_workbook_streaming(sheets, output_excel_file, build_key=key)
+    prune([content_hash for _, _, content_hash in hashed_sections], cache_dir)
+    return len(hashed_sections) - len(missing)
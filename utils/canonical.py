@@ -0,0 +1,139 @@
+import os
+import re
+from json import dumps
+from json.encoder import encode_basestring_ascii
+
+# Column order of each section, as Matrixify exports it. Section files are always written in
+# this order, whatever order the columns had in the workbook they were imported from;
+# columns not listed here (e.g. a new metafield) follow the listed ones, sorted by name.
+SECTION_COLUMNS = {
+    "Custom_Collections": [
+        "ID", "Handle", "Command", "Title", "Body HTML", "Sort Order", "Template Suffix", "Updated At",
+        "Published", "Published At", "Published Scope", "Image Src", "Image Width", "Image Height",
+        "Image Alt Text", "Row #", "Top Row", "Product: ID", "Product: Handle", "Product: Position",
+        "Product: Command", "Metafield: title_tag [string]", "Metafield: description_tag [string]",
+    ],
+    "Files": [
+        "ID", "File Name", "Command", "Link", "Alt Text", "Created At", "Type", "Mime Type", "Width",
+        "Height", "Duration", "Status", "Errors",
+    ],
+    "Menus": [
+        "ID", "Handle", "Command", "Title", "Is Default", "Top Row", "Row #", "Menu Item: ID",
+        "Menu Item: Title", "Menu Item: Command", "Menu Item: Resource Type", "Menu Item: Resource ID",
+        "Menu Item: Resource Handle", "Menu Item: Collection Tags", "Menu Item: URL", "Menu Item: Parent ID",
+        "Menu Item: Parent Title", "Menu Item: Position",
+    ],
+    "Metaobjects": [
+        "ID", "Handle", "Command", "Display Name", "Status", "Updated At", "Definition: Handle",
+        "Definition: Name", "Top Row", "Row #", "Field", "Value",
+    ],
+    "Pages": [
+        "ID", "Handle", "Command", "Title", "Author", "Body HTML", "Created At", "Updated At", "Published",
+        "Published At", "Template Suffix", "Metafield: title_tag [string]", "Metafield: description_tag [string]",
+        "Metafield: page.footer_type [single_line_text_field]",
+        "Metafield: page.campaign_id [single_line_text_field]",
+        "Metafield: page.pricebook [metaobject_reference]",
+        "Metafield: page.promo_ribbon [metaobject_reference]",
+        "Metafield: page.header_type [single_line_text_field]",
+        "Metafield: page.sas_page_url [page_reference]",
+        "Metafield: page.default_campaign [single_line_text_field]",
+        "Metafield: page.page_type [single_line_text_field]",
+        "Metafield: page.campaign_list [json]",
+        "Metafield: page.campaign_order_discount [metaobject_reference]",
+    ],
+    "Redirects": ["ID", "Path", "Command", "Target"],
+}
+
+_POSITIONS = {section: {column: position for position, column in enumerate(columns)}
+              for section, columns in SECTION_COLUMNS.items()}
+
+# Delta files are split into "Pages", "Pages 2", ... (see fielddelta)
+_PART_SUFFIX = re.compile(r" \d+$")
+
+
+# Function to get the section of a section file ("Pages 2.json" -> "Pages")
+def section_for(file_path):
+    return _PART_SUFFIX.sub("", os.path.splitext(os.path.basename(file_path))[0])
+
+
+# Function to normalize one value to its canonical JSON form
+def canonical_value(value):
+    """
+    Section values are strings; TRUE/FALSE cells stay booleans (see excelimport.json_value).
+    Missing values become "", numbers become their plain text (a whole float like 1234.0
+    becomes "1234", never "1,234") and Windows line breaks become "\\n".
+    """
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n") if "\r" in value else value
+    if value is None or isinstance(value, bool):
+        return "" if value is None else value
+    if isinstance(value, float):
+        if value != value or value in (float("inf"), float("-inf")):
+            return ""
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+# Canonical key order per (section, column layout); a section has only a handful of layouts
+_KEY_ORDERS = {}
+
+
+# Function to get the canonical order of the columns of a record
+def key_order(section, columns):
+    order = _KEY_ORDERS.get((section, columns))
+    if order is None:
+        positions = _POSITIONS.get(section)
+        if positions is None:
+            order = columns
+        else:
+            known = sorted((key for key in columns if key in positions), key=positions.__getitem__)
+            order = tuple(known) + tuple(sorted(key for key in columns if key not in positions))
+        _KEY_ORDERS[(section, columns)] = order
+    return order
+
+
+# Function to put the columns of one record in the canonical order of its section and normalize its values
+def canonical_record(record, section):
+    return {key: canonical_value(record[key]) for key in key_order(section, tuple(record))}
+
+
+# Function to serialize one record exactly like json.dumps(record, indent=4), nested `level` deep
+def record_text(record, level=0):
+    """
+    json.dumps with an indent runs the pure-Python encoder; a flat record of strings and
+    booleans is laid out here directly, escaping strings with the C encoder instead (several
+    times faster, same bytes). Anything else falls back to json.dumps.
+    """
+    if not record:
+        return "{}"
+    pad = "\n" + "    " * (level + 1)
+    parts = []
+    for key, value in record.items():
+        if isinstance(value, str):
+            parts.append(f"{pad}{encode_basestring_ascii(key)}: {encode_basestring_ascii(value)}")
+        elif value is True or value is False:
+            parts.append(f"{pad}{encode_basestring_ascii(key)}: {'true' if value else 'false'}")
+        else:
+            return dumps(record, indent=4).replace("\n", "\n" + "    " * level)
+    return "{" + ",".join(parts) + "\n" + "    " * level + "}"
+
+
+# Function to write records to a section file in canonical form, one record at a time
+def write_records(file_path, records, section=None):
+    """
+    The layout is the one of json.dump(records, f, indent=4), so files already in canonical
+    form are rewritten byte for byte.
+
+    :param file_path: Path of the JSON file to create
+    :param records: Iterable of records; never materialized as a list
+    :param section: Section whose column order to use (default: from the file name)
+    :return: Number of records written
+    """
+    section = section or section_for(file_path)
+    count = 0
+    with open(file_path, 'w', encoding="utf-8") as f:
+        for count, record in enumerate(records, start=1):
+            f.write("[\n    " if count == 1 else ",\n    ")
+            f.write(record_text(canonical_record(record, section), level=1))
+        f.write("\n]" if count else "[]")
+    return count
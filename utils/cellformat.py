@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+_FORMAT_INT = "{:,.0f}".format
+_FORMAT_FLOAT = "{:,.2f}".format
+_FORMAT_EXACT_INT = "{:,}".format
+
+
+# Function to format a single number like format_numeric (used by the streaming writer)
+def format_number(value):
+    if value is None:
+        return "nan"  # pandas turns a missing value in a numeric column into NaN
+    if isinstance(value, float) and not np.isfinite(value):
+        return _FORMAT_FLOAT(value)
+    return _FORMAT_INT(value) if value == int(value) else _FORMAT_FLOAT(value)
+
+
+# Function to format a numeric column the way Matrixify exports show numbers
+def format_numeric(series, exact_ints=False):
+    """
+    Column-at-a-time equivalent of
+    `series.apply(lambda x: f"{x:,.0f}" if pd.notna(x) and x == int(x) else f"{x:,.2f}")`.
+
+    The integral/non-integral split is computed with numpy over the whole column, then each
+    group is rendered by one bulk `map` of a bound format method (numpy has no thousands
+    separator, and its string routines are slower than CPython's formatter for this).
+
+    :param series: Numeric pandas Series
+    :param exact_ints: Format integer dtypes exactly (f"{int(x):,}") instead of through float
+    :return: Series of strings with the same index
+    """
+    if exact_ints and series.dtype.kind in "iu":
+        result = list(map(_FORMAT_EXACT_INT, series.to_numpy().tolist()))
+        return pd.Series(result, index=series.index, name=series.name, dtype=object)
+
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    integral = np.isfinite(values) & (values == np.trunc(values))
+
+    result = np.empty(len(values), dtype=object)
+    if integral.all():
+        result[:] = list(map(_FORMAT_INT, values.tolist()))
+    else:
+        result[integral] = list(map(_FORMAT_INT, values[integral].tolist()))
+        result[~integral] = list(map(_FORMAT_FLOAT, values[~integral].tolist()))
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+# Function to render a boolean column as TRUE/FALSE text
+def format_bool(series):
+    if series.dtype == bool:
+        return pd.Series(np.where(series.to_numpy(), "TRUE", "FALSE").astype(object),
+                         index=series.index, name=series.name)
+    # Nullable booleans keep their missing values
+    return series.replace({True: 'TRUE', False: 'FALSE'})
+
+
+# Function to prepare every column of a DataFrame for an Excel export
+def format_for_excel(df):
+    for col in df.columns:
+        if pd.api.types.is_bool_dtype(df[col]):
+            df[col] = format_bool(df[col])
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = format_numeric(df[col])
+    return df
+
+
+# Function to turn TRUE/FALSE text from a developer-edited workbook back into booleans
+def parse_bool_text(series):
+    values = series.to_numpy(dtype=object)
+    result = values.copy()
+    result[values == 'TRUE'] = True
+    result[values == 'FALSE'] = False
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+# Function to convert every column of a sheet read from Excel back to JSON-ready values
+def format_from_excel(df):
+    for col in df.columns:
+        # Check if the column contains 'TRUE'/'FALSE' as strings and convert them to booleans
+        if df[col].dtype == 'object' or isinstance(df[col].dtype, pd.StringDtype):
+            df[col] = parse_bool_text(df[col])
+
+        # If the column contains numeric data, format with commas, but preserve as string
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = format_numeric(df[col], exact_ints=True)
+    return df
@@ -0,0 +1,241 @@
+import os
+import re
+
+from canonical import write_records
+from sectiondiff import GITHUB_WORKSPACE, DATA_DIR, list_sections, iter_section, revision_exists
+from recordgroups import group_records, flatten
+from fielddelta import KEY_COLUMNS
+from sectionindex import read_records
+from sectionstream import iter_records
+from textblobs import intern_records, inline_records
+
+
+# Function to collect all section files under repo-shopify-data
+def list_original_files(repo_dir):
+    original_files = {}
+    for json_file in os.listdir(repo_dir):
+        if json_file.endswith(".json"):
+            section_name = os.path.splitext(json_file)[0]
+            original_files[section_name] = os.path.join(repo_dir, json_file)
+    return original_files
+
+
+# Function to load JSON records from a file, optionally only those with the given IDs
+def load_json(file_path, ids=None, snapshot_dir=None):
+    """
+    :param snapshot_dir: Read through the columnar snapshots kept in this folder (see snapshot.py);
+                         None reads the JSON itself, changed IDs through the sidecar ID index
+    """
+    if os.path.exists(file_path):
+        if snapshot_dir:
+            from snapshot import open_snapshot
+
+            # The columnar snapshot (rebuilt whenever the JSON changed) reads only the cells it needs
+            snapshot = open_snapshot(file_path, snapshot_dir)
+            if snapshot is not None:
+                with snapshot:
+                    return snapshot.read_records(ids) if ids is not None else list(snapshot.iter_records())
+        if ids is not None:
+            # Seek straight to the changed records via the sidecar ID index
+            return read_records(file_path, ids)
+        return list(iter_records(file_path))
+    return []
+
+
+# Function to write JSON data to a file (canonical column order and values, see canonical.py; blob references inlined)
+def write_json(file_path, data):
+    write_records(file_path, inline_records(data))
+
+
+# Function to write records to a JSON file one at a time (same bytes as write_json)
+def write_json_records(file_path, records):
+    """
+    :param file_path: Path of the JSON file to create
+    :param records: Iterable of records; never materialized as a list
+    :return: Number of records written
+    """
+    return write_records(file_path, inline_records(records))
+
+
+# Function to read changed IDs from changed_ids.txt
+def read_changed_ids(changed_ids_file):
+    changed_ids = {}
+    if not os.path.exists(changed_ids_file):
+        print(f"⚠️ No changed IDs file found at {changed_ids_file}. Skipping extraction.")
+        return changed_ids
+
+    with open(changed_ids_file, "r", encoding="utf-8") as file:
+        for line in file:
+            match = re.match(r'(\w+) -> (.+)', line.strip())
+            if match:
+                section = match.group(1)
+                ids = set(match.group(2).split(", "))
+                changed_ids[section] = ids
+    return changed_ids
+
+
+# Function to write changed IDs to changed_ids.txt
+def write_changed_ids(changed_ids_file, changed_ids):
+    os.makedirs(os.path.dirname(changed_ids_file), exist_ok=True)
+    with open(changed_ids_file, "w", encoding="utf-8") as output_file:
+        for section, ids in changed_ids.items():
+            output_file.write(f"{section} -> {', '.join(sorted(ids))}\n")
+
+
+# Function to pull the changed records of one section (runs in a worker process with --workers)
+def extract_section(job):
+    """
+    :param job: (section, path, ids, rev, workspace, text_blobs, snapshot_dir, index_dir)
+    :return: (section, [records]) with the rows of each object together, in Row # order
+    """
+    section, path, ids, rev, workspace, text_blobs, snapshot_dir, index_dir = job
+    if rev is None:
+        records = load_json(path, ids=ids, snapshot_dir=snapshot_dir)
+    else:
+        records = iter_records_at(path, ids, rev, workspace, index_dir)
+    if text_blobs:
+        records = intern_records(records)
+    return section, flatten(group_records(records))
+
+
+# Function to pull the changed records of every section
+def extract_changed_records(changed_ids, rev=None, workspace=GITHUB_WORKSPACE, workers=1, text_blobs=False,
+                            snapshot_dir=None, index_dir=None):
+    """
+    :param changed_ids: Dictionary {section: collection of IDs}
+    :param rev: Git revision to read the records from; None reads repo-shopify-data on disk
+    :param workspace: Repository root
+    :param workers: Extract sections in this many processes (1 = in this process)
+    :param text_blobs: Replace large text fields (Body HTML, Link) with references into the
+                       blob store (see textblobs); write_json and the Excel export inline them
+    :param snapshot_dir: Read repo-shopify-data on disk through the snapshots in this folder
+                         (see load_json); None leaves .cache/snapshots alone
+    :param index_dir: Read a revision through ID indexes of its blobs kept in this folder, so
+                      reading a section stops after its last changed record (see sectionindex)
+    :return: Dictionary {section: [records]} for sections with at least one match, in the
+             order of `changed_ids`
+    """
+    if rev is None:
+        original_files = list_original_files(os.path.join(workspace, DATA_DIR))
+    else:
+        original_files = list_sections(rev, workspace)
+
+    jobs = [
+        (section, original_files[section], ids, rev, workspace, text_blobs, snapshot_dir, index_dir)
+        for section, ids in changed_ids.items()
+        if section in original_files
+    ]
+
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(extract_section, jobs))
+    else:
+        results = [extract_section(job) for job in jobs]
+
+    return {section: relevant_blocks for section, relevant_blocks in results if relevant_blocks}
+
+
+# Function to classify changed IDs as new, updated or deleted from the ID sets of both revisions
+def classify_changed_ids(changed_ids, base_rev, head_rev=None, workspace=GITHUB_WORKSPACE):
+    """
+    Each listed section is read once per revision to collect its IDs; the classification is
+    then plain set arithmetic.
+
+    :param changed_ids: Dictionary {section: collection of IDs}
+    :param base_rev: Old revision (e.g. 'origin/main')
+    :param head_rev: New revision; None reads repo-shopify-data on disk
+    :param workspace: Repository root
+    :return: Dictionary {section: {'added': [...], 'removed': [...], 'modified': [...]}}, the
+             shape of sectiondiff.diff_revisions; IDs found on neither side are left out
+    """
+    base_sections = list_sections(base_rev, workspace)
+    head_sections = list_sections(head_rev, workspace)
+
+    changes = {}
+    for section, ids in changed_ids.items():
+        ids = {str(record_id) for record_id in ids}
+        base_ids = section_ids(base_sections.get(section), base_rev, workspace) & ids
+        head_ids = section_ids(head_sections.get(section), head_rev, workspace) & ids
+        changes[section] = {
+            "added": sorted(head_ids - base_ids),
+            "removed": sorted(base_ids - head_ids),
+            "modified": sorted(head_ids & base_ids),
+        }
+    return changes
+
+
+# Function to collect the IDs of a section at a revision (empty set when the file is missing)
+def section_ids(path, rev=None, workspace=GITHUB_WORKSPACE):
+    if path is None:
+        return set()
+    return {str(record.get("ID")) for record in iter_section(path, rev, workspace)}
+
+
+# Function to build one DELETE row per object removed since the base revision
+def delete_records(removed_ids, base_rev, workspace=GITHUB_WORKSPACE):
+    """
+    :param removed_ids: Dictionary {section: IDs present at base_rev but gone at the head}
+    :param base_rev: Revision the removed objects are read from
+    :param workspace: Repository root
+    :return: Dictionary {section: [rows]}, one row per object holding its key columns (ID,
+             Handle, Path, ...) with Command set to DELETE
+    """
+    deletions = {}
+    for section, records in extract_changed_records(removed_ids, base_rev, workspace).items():
+        rows = []
+        for object_rows in group_records(records).values():
+            top_row = object_rows[0]
+            row = {column: top_row[column] for column in KEY_COLUMNS if column in top_row}
+            row["Command"] = "DELETE"
+            rows.append(row)
+        deletions[section] = rows
+    return deletions
+
+
+# Function to append DELETE rows (or any extra rows) to extracted records, section by section
+def add_records(output_data, extra_data):
+    for section, rows in extra_data.items():
+        output_data.setdefault(section, []).extend(rows)
+    return output_data
+
+
+# Function to classify changed_ids.txt IDs against the base revision and append DELETE rows for removed ones
+def add_deletions(output_data, changed_ids, base_rev, head_rev=None, workspace=GITHUB_WORKSPACE):
+    """
+    :param output_data: Dictionary {section: [records]} extracted from the head, extended in place
+    :return: The classification (see classify_changed_ids), or None when base_rev does not exist
+    """
+    if not revision_exists(base_rev, workspace):
+        print(f"⚠️ Base revision {base_rev} not found; deleted IDs cannot be detected.")
+        return None
+    changes = classify_changed_ids(changed_ids, base_rev, head_rev, workspace)
+    print_change_kinds(changes)
+    removed_ids = {section: kinds["removed"] for section, kinds in changes.items() if kinds["removed"]}
+    if removed_ids:
+        add_records(output_data, delete_records(removed_ids, base_rev, workspace))
+    return changes
+
+
+# Function to print how many IDs of each section are new, updated or deleted
+def print_change_kinds(changes):
+    for section, kinds in changes.items():
+        print(f"🔎 {section}: {len(kinds['added'])} new, {len(kinds['modified'])} updated, "
+              f"{len(kinds['removed'])} deleted")
+
+
+# Function to stream the records with the given IDs out of a section at a git revision
+def iter_records_at(path, ids, rev, workspace=GITHUB_WORKSPACE, index_dir=None):
+    yield from iter_section(path, rev, workspace, ids=ids, index_dir=index_dir)
+
+
+# Function to write one JSON file per section into the change-only folder
+def write_change_jsons(output_dir, output_data):
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for section, relevant_blocks in output_data.items():
+        output_file_path = os.path.join(output_dir, f"{section}.json")
+        write_json(output_file_path, relevant_blocks)
+        written.append(output_file_path)
+    return written
@@ -0,0 +1,83 @@
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+import contextlib
+import subprocess
+
+from references import check_change_set
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(UTILS_DIR), "repo-shopify-data")
+
+
+def git(workspace, *args):
+    subprocess.run(["git", "-C", workspace] + list(args), check=True, stdout=subprocess.DEVNULL)
+
+
+# Function to commit repo-shopify-data with one field of one record changed, on top of the real data
+def commit_edit(workspace, section, record_id, column, value):
+    section_file = os.path.join(workspace, "repo-shopify-data", f"{section}.json")
+    with open(section_file, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    record = next(record for record in records if record["ID"] == record_id and column in record)
+    record[column] = value
+    with open(section_file, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=4)
+    git(workspace, "commit", "-q", "-am", f"{section} {record_id}: {column}")
+
+
+# Function to run check_change_set on the last commit of the workspace, quietly
+def check_last_commit(workspace, section, record_id):
+    """
+    :return: (error message or None, printed output)
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            check_change_set({section: [record_id]}, "HEAD~1", "HEAD", workspace, cache_dir=None)
+            error = None
+        except ValueError as e:
+            error = str(e)
+    return error, output.getvalue()
+
+
+if __name__ == "__main__":
+    # (label, section, ID, column, new value, should the change set be rejected)
+    cases = [
+        ("external URL in a metaobject field", "Metaobjects", "104100167961", "Value",
+         "https://cdn.example.com/promo/banner.png", False),
+        ("guessed file name that names no file", "Metaobjects", "104100167961", "Value",
+         "missing-banner.png", False),
+        ("typed page reference to no page", "Pages", "144118382873",
+         "Metafield: page.sas_page_url [page_reference]", "no-such-page", True),
+    ]
+
+    failures = []
+    workspace = tempfile.mkdtemp(prefix="sd-shopify-references-")
+    try:
+        shutil.copytree(DATA_DIR, os.path.join(workspace, "repo-shopify-data"))
+        git(workspace, "init", "-q")
+        git(workspace, "config", "user.name", "check")
+        git(workspace, "config", "user.email", "check@example.com")
+        git(workspace, "add", "repo-shopify-data")
+        git(workspace, "commit", "-q", "-m", "base")
+
+        for label, section, record_id, column, value, rejected in cases:
+            commit_edit(workspace, section, record_id, column, value)
+            error, output = check_last_commit(workspace, section, record_id)
+            ok = (error is not None) == rejected
+            print(f"{'✅' if ok else '❌'} {label}: {error or 'accepted'}")
+            if not ok:
+                failures.append(f"{label}: expected {'an error' if rejected else 'no error'}\n{output}")
+            git(workspace, "reset", "-q", "--hard", "HEAD~1")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Only typed references to missing objects stop a change set.")
@@ -0,0 +1,96 @@
+import io
+import os
+import sys
+import glob
+import argparse
+import tempfile
+import contextlib
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(UTILS_DIR), "repo-shopify-data")
+
+
+# Function to export a folder of section files to a workbook, quietly
+def export(json_dir, output_folder):
+    from excelexport import json_to_excel
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return json_to_excel(json_dir, output_folder, streaming=True)
+
+
+# Function to import a workbook back into section files, quietly
+def import_(excel_file, output_dir):
+    from excelimport import EXCLUDED_SHEETS, excel_to_json
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        excel_to_json(excel_file, output_dir, EXCLUDED_SHEETS)
+    return output_dir
+
+
+# Function to rewrite a workbook the way a developer's edits might: columns in reverse order
+# and whole-number text stored as numbers. Neither changes what the sheets mean.
+def scramble(excel_file, output_file):
+    from openpyxl import Workbook, load_workbook
+
+    source = load_workbook(excel_file, read_only=True)
+    target = Workbook(write_only=True)
+    for worksheet in source.worksheets:
+        sheet = target.create_sheet(worksheet.title)
+        for row in worksheet.iter_rows(values_only=True):
+            cells = []
+            for value in reversed(row):
+                # Stay below 15 digits, where Excel keeps whole numbers exact
+                if isinstance(value, str) and value.isdigit() and len(value) < 15 and value[0] != "0":
+                    value = int(value)
+                cells.append(value)
+            sheet.append(cells)
+    source.close()
+    target.save(output_file)
+    return output_file
+
+
+# Function to compare the section files of two folders byte for byte
+def compare(expected_dir, actual_dir, label):
+    failures = []
+    for expected in sorted(glob.glob(os.path.join(expected_dir, "*.json"))):
+        name = os.path.basename(expected)
+        actual = os.path.join(actual_dir, name)
+        if not os.path.exists(actual):
+            failures.append(f"{label}: {name} missing")
+            continue
+        with open(expected, "rb") as f1, open(actual, "rb") as f2:
+            same = f1.read() == f2.read()
+        print(f"{'✅' if same else '❌'} {label}: {name}")
+        if not same:
+            failures.append(f"{label}: {name} differs")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that Excel -> JSON -> Excel -> JSON is a fixed point.")
+    parser.add_argument("--json-dir", default=DATA_DIR, help="Section files to start from (default: repo-shopify-data)")
+    parser.add_argument("--no-scramble", action="store_true",
+                        help="Import the exported workbook as is instead of reordering its columns first")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sd-shopify-roundtrip-") as scratch:
+        workbook = export(args.json_dir, os.path.join(scratch, "export-0"))
+        if not args.no_scramble:
+            workbook = scramble(workbook, os.path.join(scratch, "scrambled.xlsx"))
+
+        first = import_(workbook, os.path.join(scratch, "json-1"))
+        second = import_(export(first, os.path.join(scratch, "export-1")), os.path.join(scratch, "json-2"))
+
+        # A workbook that only restates the section files must not change them, and
+        # importing an export of the imported files must give the same bytes again
+        failures = compare(args.json_dir, first, "no-op import") + compare(first, second, "fixed point")
+
+    # Drop the snapshots the exports made of the scratch files, so they do not pile up in .cache
+    from snapshot import prune_snapshots
+    prune_snapshots()
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Excel -> JSON -> Excel -> JSON is a fixed point.")
@@ -0,0 +1,75 @@
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules the lightweight subcommands must never import
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "xlsxwriter")
+
+
+# Function to build the lightweight subcommands to time, each run for real against temp folders
+def light_commands(scratch):
+    ids_file = os.path.join(scratch, "changed_ids.txt")
+    source_dir = os.path.join(scratch, "promote-source")
+    target_dir = os.path.join(scratch, "promote-target")
+    os.makedirs(source_dir, exist_ok=True)
+    os.makedirs(target_dir, exist_ok=True)
+    return {
+        "diff": ["diff", "--base", "HEAD", "--worktree", "--no-cache", "--json"],
+        "ids": ["ids", "--base", "HEAD", "--worktree", "--no-cache", "--output", ids_file],
+        "extract": ["extract", "--base", "HEAD", "--worktree", "--ids", ids_file,
+                    "--output-dir", os.path.join(scratch, "change-only-jsons")],
+        "promote": ["promote", "--source-dir", source_dir, "--target-dir", target_dir],
+    }
+
+
+# Function to run sd_shopify.py under -X importtime and collect the imported modules
+def import_times(arguments, env):
+    """
+    :return: (dictionary {module: cumulative µs}, total import µs of top-level imports, exit code)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", os.path.join(UTILS_DIR, "sd_shopify.py")] + arguments,
+                            capture_output=True, text=True, env=env, cwd=UTILS_DIR)
+    modules, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        # Nested imports are indented; only top-level ones add up to the total
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return modules, total, result.returncode
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the lightweight sd-shopify subcommands start fast.")
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="Maximum import time of one subcommand in ms (default: 250)")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="sd-shopify-startup-") as scratch:
+        env = dict(os.environ, METRICS_DIR=os.path.join(scratch, "run-reports"), METRICS_PROFILE="")
+        for command, arguments in light_commands(scratch).items():
+            modules, total, returncode = import_times(arguments, env)
+            heavy = sorted(name for name in modules if name.split(".")[0] in HEAVY_MODULES)
+            slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:3]
+            print(f"⏱️ {command:<8} {total / 1000:7.1f} ms imports   slowest: "
+                  + ", ".join(f"{name} {micros / 1000:.1f} ms" for name, micros in slowest))
+
+            if returncode != 0:
+                failures.append(f"{command}: exited with {returncode}")
+            if heavy:
+                failures.append(f"{command}: imports {', '.join(heavy[:5])}")
+            if total / 1000 > args.budget_ms:
+                failures.append(f"{command}: {total / 1000:.1f} ms of imports, over the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Lightweight subcommands start without pandas, openpyxl or xlsxwriter.")
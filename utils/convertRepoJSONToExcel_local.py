@@ -4,6 +4,9 @@ import os
 import glob
 from datetime import datetime
 
+from cellformat import format_for_excel
+from metrics import RunMetrics
+
 # Function to convert JSON files from a directory into an Excel file
 def json_to_excel(json_dir, output_folder):
     """
@@ -38,12 +41,8 @@ def json_to_excel(json_dir, output_folder):
             # Convert JSON data to a DataFrame
             df = pd.DataFrame(json_data)
 
-            # Convert True/False to 'TRUE'/'FALSE'
-            for col in df.columns:
-                if pd.api.types.is_bool_dtype(df[col]):
-                    df[col] = df[col].replace({True: 'TRUE', False: 'FALSE'})
-                elif pd.api.types.is_numeric_dtype(df[col]):
-                    df[col] = df[col].apply(lambda x: f"{x:,.0f}" if pd.notna(x) and x == int(x) else f"{x:,.2f}")
+            # Convert True/False to 'TRUE'/'FALSE' and format numbers, whole columns at a time
+            df = format_for_excel(df)
 
             # Write DataFrame to the corresponding sheet
             df.to_excel(writer, sheet_name=sheet_name, index=False)
@@ -56,9 +55,14 @@ folder_mappings = {
     "../changes/change-only-jsons": "../changes/change-only-excel"
 } 
 
+metrics = RunMetrics("convertRepoJSONToExcel_local")
+
 # Process each JSON directory
 for json_dir, output_dir in folder_mappings.items():
     print(f"Processing {json_dir}...")
+    metrics.begin(os.path.basename(output_dir)).add(
+        bytes=sum(os.path.getsize(json_file) for json_file in glob.glob(os.path.join(json_dir, '*.json'))))
     json_to_excel(json_dir, output_dir)
 
 print("✅ All conversions completed!")
+metrics.finish()
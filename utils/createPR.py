@@ -1,24 +1,24 @@
-import json
-import os
-import glob
-import shutil  # This will be used for file copying
+import sys
+
+from metrics import RunMetrics
+from promote import promote
 
 # Paths to the output and repo directories
 output_json_dir = '../output_json'  # Directory containing the JSON files generated from the script
 repo_json_dir = '../repo-shopify-data'  # Source of truth directory
 
-# Get all JSON files in the output directory
-output_json_files = glob.glob(os.path.join(output_json_dir, '*.json'))
-
-# Process each JSON file
-for output_json_path in output_json_files:
-    # Derive the corresponding repo file path from the output path
-    file_name = os.path.basename(output_json_path)
-    repo_json_path = os.path.join(repo_json_dir, file_name)
+metrics = RunMetrics("createPR")
 
-    # Copy the file from the output_json directory to the repo_json directory.
+# Merge the imported sections into the repo by ID: unchanged records keep their exact bytes,
+# and every file is validated before any of them is replaced (atomically).
+# The developer workbook is a full export, so records deleted in Excel are deleted here too.
+with metrics.stage("promote") as stage:
     try:
-        shutil.copy(output_json_path, repo_json_path)  # This will copy the file to the destination
-        print(f"Successfully copied {file_name} to {repo_json_path}")
-    except Exception as e:
-        print(f"Error copying {file_name} to {repo_json_path}: {e}")
+        plans = promote(output_json_dir, repo_json_dir, prune=True)
+    except ValueError as e:
+        print(f"❌ Promotion aborted: {e}")
+        metrics.finish("failed")
+        sys.exit(1)
+    stage.add(records=sum(plan["added"] + plan["updated"] + plan["deleted"] for plan in plans),
+              bytes=sum(len(plan["data"]) for plan in plans if plan["data"] is not None))
+metrics.finish()
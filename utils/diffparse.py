@@ -0,0 +1,119 @@
+import os
+import re
+import mmap
+
+# Start of every file in a git diff (found with bytes.find: a "^" regex is ~10x slower on large diffs)
+FILE_HEADER = b"diff --git "
+SECTION_PATTERN = re.compile(rb"diff --git a/repo-shopify-data/([\w-]+)\.json")
+
+# Hunk header: IDs are only taken from the hunks, never from the file header
+HUNK_HEADER = b"\n@@"
+
+# Captures both Shopify GIDs and numeric IDs
+ID_PATTERN = re.compile(rb'"ID":\s*"((?:gid://shopify/[\w/]+/)?\d+)"')
+
+# Hunk text handed to one worker at a time; larger hunk runs are cut at the next "@@" or line
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+# Function to open a diff file as a read-only memory map (None for an empty file)
+def map_file(diff_file):
+    with open(diff_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# Function to find the hunk text of every section file in a diff, as byte ranges
+def section_ranges(data):
+    """
+    :param data: Memory map (or bytes) of a git diff
+    :return: List of (section, start, end): from the first "@@" of the file to the next
+             "diff --git"; files outside repo-shopify-data are skipped
+    """
+    starts = [0] if data[:len(FILE_HEADER)] == FILE_HEADER else []
+    position = data.find(b"\n" + FILE_HEADER)
+    while position >= 0:
+        starts.append(position + 1)
+        position = data.find(b"\n" + FILE_HEADER, position + 1)
+    starts.append(len(data))
+
+    ranges = []
+    for start, end in zip(starts, starts[1:]):
+        section = SECTION_PATTERN.match(data, start, end)
+        if section is None:
+            continue
+        hunk = data.find(HUNK_HEADER, start, end)
+        if hunk >= 0:
+            ranges.append((section.group(1).decode("ascii"), hunk + 1, end))
+    return ranges
+
+
+# Function to cut byte ranges into chunks of about `size` bytes at hunk (or else line) boundaries
+def split_ranges(data, ranges, size=CHUNK_BYTES):
+    """
+    An ID never spans lines, so any line boundary is a safe cut; a hunk boundary is preferred.
+    Nothing is copied: chunks are (section, start, end) offsets into `data`.
+    """
+    chunks = []
+    for section, start, end in ranges:
+        while end - start > size:
+            cut = data.find(HUNK_HEADER, start + size, end)
+            if cut < 0 or cut - start > 2 * size:
+                cut = data.find(b"\n", start + size, end)
+            if cut < 0:
+                break
+            chunks.append((section, start, cut + 1))
+            start = cut + 1
+        chunks.append((section, start, end))
+    return chunks
+
+
+# Function to collect the IDs in some chunks of a diff file (runs in a worker process with workers > 1)
+def scan_chunks(job):
+    """
+    :param job: (diff file path, [(section, start, end), ...]); the worker maps the file itself
+    :return: List of (section, set of IDs) in chunk order
+    """
+    diff_file, chunks = job
+    data = map_file(diff_file)
+    try:
+        return [(section, {match.decode("ascii") for match in ID_PATTERN.findall(data, start, end)})
+                for section, start, end in chunks]
+    finally:
+        data.close()
+
+
+# Function to extract the IDs of every changed hunk of a git diff, per section
+def extract_ids(diff_file, workers=1, chunk_bytes=CHUNK_BYTES):
+    """
+    Every ID in the hunks of a repo-shopify-data/*.json file counts, context lines included.
+
+    :param diff_file: Path of the git diff (e.g. changes/git-diff/changes.diff)
+    :param workers: Scan chunks in this many processes (1 = in this process)
+    :param chunk_bytes: Approximate size of one chunk of hunk text
+    :return: Dictionary {section: sorted IDs}, sections in diff order, without empty sections
+    """
+    data = map_file(diff_file)
+    if data is None:
+        return {}
+    try:
+        chunks = split_ranges(data, section_ranges(data), chunk_bytes)
+    finally:
+        data.close()
+
+    if workers > 1 and len(chunks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Contiguous slices keep the results in diff order
+        step = -(-len(chunks) // (workers * 4))
+        jobs = [(diff_file, chunks[position:position + step]) for position in range(0, len(chunks), step)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = [found for part in pool.map(scan_chunks, jobs) for found in part]
+    else:
+        results = scan_chunks((diff_file, chunks))
+
+    changed_ids = {}
+    for section, ids in results:
+        changed_ids.setdefault(section, set()).update(ids)
+    return {section: sorted(ids) for section, ids in changed_ids.items() if ids}
@@ -0,0 +1,362 @@
+import os
+import glob
+import shutil
+from datetime import datetime
+
+from recordgroups import iter_object_rows
+from sectionstream import iter_records
+
+# Custom document property holding the build key of a workbook (see buildcache)
+BUILD_KEY_PROPERTY = "build_key"
+
+# Bump whenever the cell text of exported sheets changes (cellformat or render_rows),
+# so cached rendered sheets and skipped exports are rebuilt
+FORMATTER_VERSION = 2
+
+
+# Function to derive the sheet name from a section file (Excel sheet names max length = 31)
+def sheet_name_for(json_file):
+    return os.path.splitext(os.path.basename(json_file))[0][:31]
+
+
+# Function to read all records of a section file, from its snapshot when one can be used
+def section_records(json_file, snapshot_dir=None):
+    if not snapshot_dir:
+        return iter_records(json_file)
+    from snapshot import open_snapshot
+
+    snapshot = open_snapshot(json_file, snapshot_dir)
+    if snapshot is None:
+        return iter_records(json_file)
+    with snapshot:
+        return list(snapshot.iter_records())
+
+
+# Function to parse and format one sheet (runs in a worker process with --workers)
+def render_sheet(sheet):
+    """
+    :param sheet: (sheet_name, list of records or path to a section file, snapshot folder or None)
+    :return: (sheet_name, formatted DataFrame)
+    """
+    import pandas as pd
+    from cellformat import format_for_excel
+    from textblobs import inline_records
+
+    sheet_name, json_data, snapshot_dir = sheet
+    if isinstance(json_data, str):
+        json_data = section_records(json_data, snapshot_dir)
+    else:
+        # Extracted records may carry blob references (see changeset.extract_changed_records)
+        json_data = inline_records(json_data)
+    # Multi-row objects go out with their rows in Row # order
+    return sheet_name, format_for_excel(pd.DataFrame(list(iter_object_rows(json_data))))
+
+
+# Function to write sheets into one Excel workbook
+def write_workbook(sheets, output_excel_file, workers=1, build_key=None, snapshot_dir=None):
+    """
+    With workers > 1, sections are parsed and formatted in a process pool while this
+    process alone writes the finished sheets, in input order.
+
+    :param sheets: Iterable of (sheet_name, list of records or path to a section file)
+    :param output_excel_file: Path of the .xlsx file to create
+    :param workers: Number of worker processes (1 = everything in this process)
+    :param build_key: Stamped into the workbook's custom properties (see buildcache)
+    :param snapshot_dir: Read section files through the snapshots in this folder (None = the JSON)
+    """
+    import pandas as pd
+
+    sheets = ((sheet_name, json_data, snapshot_dir) for sheet_name, json_data in sheets)
+
+    with pd.ExcelWriter(output_excel_file, engine='xlsxwriter') as writer:
+        if build_key:
+            writer.book.set_custom_property(BUILD_KEY_PROPERTY, build_key)
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for sheet_name, df in pool.map(render_sheet, sheets):
+                    df.to_excel(writer, sheet_name=sheet_name[:31], index=False)
+        else:
+            for sheet in sheets:
+                sheet_name, df = render_sheet(sheet)
+                df.to_excel(writer, sheet_name=sheet_name[:31], index=False)
+
+    return output_excel_file
+
+
+# Function to classify each column the way pandas would type it (first pass of the streaming writer)
+def column_kinds(records):
+    """
+    :param records: Iterable of JSON records
+    :return: Ordered dictionary {column: 'bool' | 'numeric' | 'object'} in first-seen order,
+             matching the dtype pandas.DataFrame(records) would infer
+    """
+    flags_by_column = {}
+    for count, record in enumerate(records):
+        for key, value in record.items():
+            flags = flags_by_column.get(key)
+            if flags is None:
+                flags = flags_by_column[key] = {"absent"} if count else set()
+            if value is None:
+                flags.add("none")
+            elif isinstance(value, bool):
+                flags.add("bool")
+            elif isinstance(value, int):
+                flags.add("number" if -2 ** 63 <= value < 2 ** 63 else "other")
+            elif isinstance(value, float):
+                flags.add("number")
+            else:
+                flags.add("other")
+
+        # Records whose keys are a strict subset of the known columns leave gaps
+        if len(record) < len(flags_by_column):
+            for key, flags in flags_by_column.items():
+                if key not in record:
+                    flags.add("absent")
+
+    kinds = {}
+    for key, flags in flags_by_column.items():
+        if flags == {"bool"}:
+            kinds[key] = "bool"
+        elif flags <= {"number", "none", "absent"} and flags & {"number", "absent"}:
+            # Absent keys become NaN, so a column of only gaps and None is float64 too
+            kinds[key] = "numeric"
+        else:
+            kinds[key] = "object"
+    return kinds
+
+
+# Function to build the record -> row of cell values function for the (column, kind) pairs of column_kinds
+def row_renderer(columns):
+    from cellformat import format_number
+
+    def render(record):
+        row = []
+        for name, kind in columns:
+            value = record.get(name)
+            if kind == "numeric":
+                value = format_number(value)
+            elif kind == "bool":
+                value = 'TRUE' if value else 'FALSE'
+            elif value is None or value != value:
+                value = None  # Missing values stay empty, like pandas' na_rep=''
+            row.append(value)
+        return row
+
+    return render
+
+
+# Function to render a section file as rows of cell values (header first), two passes over the file
+def render_rows(json_file, snapshot_dir=None):
+    """
+    Cell text and row order match write_workbook (TRUE/FALSE, formatted numbers, multi-row
+    objects in Row # order). The first pass collects the columns and their types, the second
+    renders the rows one at a time. With snapshots, sections holding only text (all of them
+    today) are read column by column from their snapshot instead.
+
+    :param json_file: Path to a section file
+    :param snapshot_dir: Folder of the columnar snapshots (see snapshot.py); None reads the JSON
+    :return: Generator of lists: the column names, then one list per record (None = empty cell)
+    """
+    snapshot = None
+    if snapshot_dir:
+        from snapshot import open_snapshot
+
+        snapshot = open_snapshot(json_file, snapshot_dir)
+    if snapshot is not None and not snapshot.has_literals:
+        # All values are text, so every column is 'object' and cells go out exactly as stored
+        with snapshot:
+            order = snapshot.object_row_order()
+            positions = snapshot.columns_in_order(order)
+            yield [snapshot.columns[position] for position in positions]
+            yield from snapshot.iter_rows(positions, order)
+        return
+    if snapshot is not None:
+        snapshot.close()
+
+    columns = list(column_kinds(iter_object_rows(iter_records(json_file))).items())
+    yield [name for name, _ in columns]
+
+    render = row_renderer(columns)
+    for record in iter_object_rows(iter_records(json_file)):
+        yield render(record)
+
+
+# Function to write rendered rows (header first) into a worksheet
+def write_rows(worksheet, rows):
+    for row_number, row in enumerate(rows):
+        for col, value in enumerate(row):
+            if value is not None:
+                worksheet.write(row_number, col, value)
+
+
+# Function to write section files into one workbook without holding any sheet in memory
+def write_workbook_streaming(sections, output_excel_file, build_key=None, snapshot_dir=None):
+    """
+    Rows go straight from the record iterator into xlsxwriter's constant_memory worksheets.
+
+    :param sections: Iterable of (sheet_name, json_file), or (sheet_name, rows) where rows
+                     is an iterable shaped like render_rows' output
+    :param output_excel_file: Path of the .xlsx file to create
+    :param build_key: Stamped into the workbook's custom properties (see buildcache)
+    :param snapshot_dir: Render section files through the snapshots in this folder (None = the JSON)
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output_excel_file, {"constant_memory": True})
+    try:
+        if build_key:
+            workbook.set_custom_property(BUILD_KEY_PROPERTY, build_key)
+        for sheet_name, source in sections:
+            worksheet = workbook.add_worksheet(sheet_name[:31])
+            write_rows(worksheet, render_rows(source, snapshot_dir) if isinstance(source, str) else source)
+    finally:
+        workbook.close()
+
+    return output_excel_file
+
+
+# Function to generate a unique Excel file name in the output folder
+def export_file_name(output_folder):
+    current_time = datetime.now().strftime('%Y-%m-%d_%H%M%S')
+    return os.path.join(output_folder, f'Export_{current_time}.xlsx')
+
+
+# Function to delete the other exports in a folder (workbooks and split export folders) once a new one has been written
+def remove_older_exports(output_folder, keep_file):
+    for export in glob.glob(os.path.join(output_folder, 'Export_*')):
+        if os.path.abspath(export) == os.path.abspath(keep_file):
+            continue
+        if os.path.isdir(export):
+            shutil.rmtree(export)
+        elif export.endswith('.xlsx'):
+            os.remove(export)
+        else:
+            continue
+        print(f"🧹 Removed previous export: {export}")
+
+
+# Function to convert JSON files from a directory into an Excel file
+def json_to_excel(json_dir, output_folder, streaming=False, workers=1, cache_dir=None, replace=False,
+                  max_rows=None, max_mb=None, snapshot_dir=None):
+    """
+    :param json_dir: Directory containing the JSON files (searched recursively)
+    :param output_folder: Folder where the Excel file will be saved
+    :param streaming: Write rows straight from the files with bounded memory
+    :param workers: Parse and format sections in this many processes
+    :param cache_dir: Build cache folder (see buildcache). When set, nothing is written if an
+                      export of the same section contents already exists in output_folder, and
+                      unchanged sections reuse their rendered rows
+    :param replace: Delete the folder's other Export_*.xlsx files after writing a new one
+    :param max_rows: Split the export into workbooks of at most this many data rows (see workbooksplit)
+    :param max_mb: Split the export into workbooks of at most this much cell text
+    :param snapshot_dir: Read the section files through the columnar snapshots kept in this
+                         folder (see snapshot.py); None reads the JSON and writes no snapshots
+    :return: Path of the new Excel file (of the manifest for a split export), or None when nothing was written
+    """
+    print(f"🔍 Searching for JSON files in: {os.path.abspath(json_dir)}")
+
+    # Get all JSON files recursively, in a stable order so sheets always come out the same way
+    json_files = sorted(glob.glob(os.path.join(json_dir, '**', '*.json'), recursive=True))
+
+    if not json_files:
+        print(f"🚫 Skipping {json_dir} (No JSON files found).")
+        return None
+
+    # Ensure output folder exists
+    os.makedirs(output_folder, exist_ok=True)
+
+    if max_rows or max_mb:
+        from workbooksplit import find_split_export, split_export
+
+        key = None
+        if cache_dir:
+            from buildcache import build_key, section_hashes
+
+            hashed_sections = section_hashes((sheet_name_for(json_file), json_file) for json_file in json_files)
+            key = build_key([(sheet_name, content_hash) for sheet_name, _, content_hash in hashed_sections]
+                            + [("limits", f"{max_rows or ''}/{max_mb or ''}")])
+            existing = find_split_export(output_folder, key)
+            if existing:
+                print(f"♻️ {json_dir} unchanged since {existing}, skipping the export.")
+                return None
+
+        print(f"📄 Splitting {len(json_files)} JSON files in {json_dir}...")
+        manifest_file = split_export(json_files, output_folder, max_rows, max_mb, workers, key)
+        if replace:
+            remove_older_exports(output_folder, os.path.dirname(manifest_file))
+        print(f"🎉 Split export created: {manifest_file}")
+        return manifest_file
+
+    if cache_dir:
+        from buildcache import build_key, section_hashes, find_workbook, write_cached_workbook
+
+        hashed_sections = section_hashes((sheet_name_for(json_file), json_file) for json_file in json_files)
+        key = build_key((sheet_name, content_hash) for sheet_name, _, content_hash in hashed_sections)
+        existing = find_workbook(output_folder, key)
+        if existing:
+            print(f"♻️ {json_dir} unchanged since {existing}, skipping the export.")
+            return None
+
+        output_excel_file = export_file_name(output_folder)
+        print(f"📄 Processing {len(json_files)} JSON files in {json_dir}...")
+
+        # Rendered sheets are kept per output folder so the two exports never prune each other
+        folder_cache = os.path.join(cache_dir, os.path.basename(os.path.normpath(output_folder)))
+        reused = write_cached_workbook(hashed_sections, output_excel_file, key, folder_cache, workers, snapshot_dir)
+        print(f"♻️ {reused} of {len(json_files)} sections reused from the build cache.")
+    else:
+        # Generate unique Excel file name
+        output_excel_file = export_file_name(output_folder)
+
+        print(f"📄 Processing {len(json_files)} JSON files in {json_dir}...")
+
+        # Sections are loaded lazily (or by the worker processes) while the workbook is being written
+        def sheets():
+            for json_file in json_files:
+                print(f"✅ Processing file: {json_file}")
+                yield sheet_name_for(json_file), json_file
+
+        if streaming:
+            write_workbook_streaming(sheets(), output_excel_file, snapshot_dir=snapshot_dir)
+        else:
+            write_workbook(sheets(), output_excel_file, workers, snapshot_dir=snapshot_dir)
+
+    if replace:
+        remove_older_exports(output_folder, output_excel_file)
+
+    print(f"🎉 Excel file created: {output_excel_file}")
+
+    return output_excel_file  # Return the file path for GitHub push
+
+
+# Function to write in-memory change records {section: records} into an Excel file
+def records_to_excel(output_data, output_folder, workers=1, skip_unchanged=False):
+    """
+    :param output_data: Dictionary {section: [records]}
+    :param output_folder: Folder where the Excel file will be saved
+    :param workers: Format sections in this many processes
+    :param skip_unchanged: Write nothing if an export of the same records already exists
+    :return: Path of the new Excel file, or None when nothing was written
+    """
+    if not output_data:
+        print("🚫 No changed records to export.")
+        return None
+
+    key = None
+    if skip_unchanged:
+        from buildcache import records_key, find_workbook
+
+        key = records_key(output_data)
+        existing = find_workbook(output_folder, key)
+        if existing:
+            print(f"♻️ Same changed records as {existing}, skipping the export.")
+            return None
+
+    os.makedirs(output_folder, exist_ok=True)
+    output_excel_file = export_file_name(output_folder)
+    write_workbook(output_data.items(), output_excel_file, workers, build_key=key)
+
+    print(f"🎉 Excel file created: {output_excel_file}")
+    return output_excel_file
@@ -0,0 +1,145 @@
+import os
+
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+
+from changeset import write_json_records
+
+# Cell text pandas.read_excel treats as missing by default (keep_default_na=True)
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+# Sheets that are never converted back to JSON
+EXCLUDED_SHEETS = ["Export Summary"]
+
+
+# Function to turn one cell into the text pandas.read_excel(dtype=str) would produce
+def cell_text(value):
+    """
+    :param value: Cell value as returned by openpyxl in read_only / values_only mode
+    :return: String, or None for a missing cell
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return None if value in NA_VALUES or value in ERROR_CODES else value
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (int, float)):
+        # Same as pandas' openpyxl reader: whole numbers come back as ints
+        if value != value:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    return str(value)
+
+
+# Function to turn one cell text into the JSON value (TRUE/FALSE text becomes a boolean)
+def json_value(text):
+    if text is None:
+        return ""
+    if text == 'TRUE':
+        return True
+    if text == 'FALSE':
+        return False
+    return text
+
+
+# Function to build the column names of a sheet the way pandas names DataFrame columns
+def column_names(header, width):
+    """
+    :param header: Values of the first row
+    :param width: Number of columns in the sheet
+    :return: List of unique column names ("Unnamed: N" for blank headers, "Name.1" for repeats)
+    """
+    names = []
+    seen = {}
+    for position in range(width):
+        value = header[position] if position < len(header) else None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        name = f"Unnamed: {position}" if value is None or value == "" else str(value)
+
+        count = seen.get(name, 0)
+        unique = name
+        while unique in seen:
+            count += 1
+            unique = f"{name}.{count}"
+        seen[name] = count
+        seen[unique] = 0
+        names.append(unique)
+    return names
+
+
+# Function to count the cells of a row up to its last non-empty one
+def trimmed_length(row):
+    length = len(row)
+    while length and (row[length - 1] is None or row[length - 1] == ""):
+        length -= 1
+    return length
+
+
+# Function to stream the records of one worksheet
+def iter_sheet_records(worksheet):
+    """
+    Reads a read-only openpyxl worksheet row by row. The output matches
+    `pd.read_excel(sheet, dtype=str).fillna("")` followed by format_from_excel: every value
+    is a string except TRUE/FALSE text, which becomes a boolean; blank rows in the middle
+    of a sheet are kept and trailing blank rows are dropped.
+
+    :param worksheet: openpyxl worksheet opened with read_only=True
+    :return: Generator of records (dictionaries in column order)
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    width = trimmed_length(header)
+    if worksheet.max_column is None or worksheet.max_column > width:
+        # The sheet dimension leaves room for data wider than the header: pandas names those
+        # columns too, so measure the real width first (cheap next to the conversion itself)
+        width = max([width] + [trimmed_length(row) for row in worksheet.iter_rows(min_row=2, values_only=True)])
+    names = column_names(header, width)
+
+    pending_blank = 0
+    for row in rows:
+        if trimmed_length(row) == 0:
+            # Hold blank rows back until a non-blank row shows they are not trailing
+            pending_blank += 1
+            continue
+
+        for _ in range(pending_blank):
+            yield dict.fromkeys(names, "")
+        pending_blank = 0
+
+        texts = [cell_text(value) for value in row[:width]]
+        texts.extend([None] * (width - len(texts)))
+        yield {name: json_value(text) for name, text in zip(names, texts)}
+
+
+# Function to convert every sheet of a workbook into one JSON file per section, one sheet at a time
+def excel_to_json(excel_file, output_dir, excluded_sheets=EXCLUDED_SHEETS):
+    """
+    :param excel_file: Path of the developer-edited .xlsx workbook
+    :param output_dir: Folder where <sheet>.json files are written
+    :param excluded_sheets: Sheet names to skip
+    :return: Dictionary {sheet name: number of records written}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workbook = load_workbook(excel_file, read_only=True, data_only=True)
+    written = {}
+    try:
+        for worksheet in workbook.worksheets:
+            if worksheet.title in excluded_sheets:
+                continue
+            output_file = os.path.join(output_dir, f"{worksheet.title}.json")
+            written[worksheet.title] = write_json_records(output_file, iter_sheet_records(worksheet))
+            print(f"✅ {worksheet.title}: {written[worksheet.title]} rows -> {output_file}")
+    finally:
+        workbook.close()
+    return written
+
@@ -1,7 +1,12 @@
-import json
 import os
 import re
 
+from canonical import write_records
+from metrics import RunMetrics
+from recordgroups import group_records, flatten
+from sectionindex import read_records
+from sectionstream import iter_records
+
 # Function to read config properties
 def load_properties(filepath):
     properties = {}
@@ -29,17 +34,18 @@ for file_path in config["REPO_FILES"].split(", "):
     section_name = os.path.basename(file_path).replace(".json", "")
     original_files[section_name] = file_path
 
-# Function to load JSON data from a file
-def load_json(file_path):
+# Function to load JSON records from a file, optionally only those with the given IDs
+def load_json(file_path, ids=None):
     if os.path.exists(file_path):
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        if ids is not None:
+            # Seek straight to the changed records via the sidecar ID index
+            return read_records(file_path, ids)
+        return list(iter_records(file_path))
     return []
 
-# Function to write JSON data to a file
+# Function to write JSON data to a file (canonical column order and values, see canonical.py)
 def write_json(file_path, data):
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
+    write_records(file_path, data)
 
 # Function to read changed IDs from changed_ids.txt
 def read_changed_ids(changed_ids_file):
@@ -49,12 +55,15 @@ def read_changed_ids(changed_ids_file):
             match = re.match(r'(\w+) -> (.+)', line.strip())  
             if match:
                 section = match.group(1)
-                ids = match.group(2).split(", ")  
+                ids = set(match.group(2).split(", "))  
                 changed_ids[section] = ids
     return changed_ids
 
+metrics = RunMetrics("extract-changes-dev-triage")
+
 # Read changed IDs
 changed_ids = read_changed_ids(changed_ids_file)
+stage = metrics.begin("extract")
 
 # Dictionary to store extracted data
 output_data = {}
@@ -63,15 +72,15 @@ output_data = {}
 for section, ids in changed_ids.items():
     if section in original_files:
         file_path = original_files[section]
-        data = load_json(file_path)
-
-        # Extract only blocks that match the changed IDs
-        relevant_blocks = [block for block in data if str(block.get('ID')) in ids]
+        # Stream only the blocks that match the changed IDs, each object's rows in Row # order
+        relevant_blocks = flatten(group_records(load_json(file_path, ids=ids)))
 
         if relevant_blocks:
             output_data[section] = relevant_blocks
             output_file_path = os.path.join(output_dir, f"{section}.json")
             write_json(output_file_path, relevant_blocks)
+            stage.add(records=len(relevant_blocks), bytes=os.path.getsize(output_file_path))
             print(f"Extracted {len(relevant_blocks)} blocks for {section} and saved to {output_file_path}")
 
 print("Extraction process completed.")
+metrics.finish()
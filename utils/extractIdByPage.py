@@ -1,7 +1,13 @@
 import os
-import re
+import argparse
 import subprocess
 
+from changeset import write_changed_ids
+from diffparse import extract_ids
+from metrics import RunMetrics
+from baseline import BaselineManifest
+from sectiondiff import diff_revisions, changed_ids_by_section
+
 # Detect if running in GitHub Actions
 GITHUB_WORKSPACE = os.getenv("GITHUB_WORKSPACE", os.getcwd())  # Use GitHub workspace if available
 
@@ -13,60 +19,62 @@ output_file_path = os.path.join(output_folder, "changed_ids.txt")
 # Ensure the output directory exists
 os.makedirs(output_folder, exist_ok=True)
 
-# Dictionary to store extracted IDs grouped by section (Pages, Redirects, Files, etc.)
-changed_ids = {}
-
-# Regular expressions for parsing the diff file
-section_pattern = re.compile(r'^diff --git a/repo-shopify-data/([\w-]+)\.json')
-id_pattern = re.compile(r'"ID":\s*"((?:gid://shopify/[\w/]+/)?\d+)"')  # Captures both Shopify GID & numeric IDs
-change_block_pattern = re.compile(r'^@@')
-
-# Initialize variables
-current_section = None
-inside_change_block = False
-change_block_lines = []
-
-# Ensure diff file exists before processing
-if not os.path.exists(diff_file_path):
-    print(f"❌ Error: Diff file not found at {diff_file_path}")
-    exit(1)
-
-# Read and process the diff file
-with open(diff_file_path, "r", encoding="utf-8") as file:
-    for line in file:
-        section_match = section_pattern.search(line)
-        if section_match:
-            if current_section and change_block_lines:
-                ids = id_pattern.findall(" ".join(change_block_lines))
-                changed_ids[current_section].update(ids)
-            current_section = section_match.group(1)
-            if current_section not in changed_ids:
-                changed_ids[current_section] = set()
-            inside_change_block = False
-            change_block_lines = []
-
-        if change_block_pattern.search(line):
-            inside_change_block = True
-            change_block_lines = []  
-
-        if inside_change_block:
-            change_block_lines.append(line.strip())  
-
-if current_section and change_block_lines:
-    ids = id_pattern.findall(" ".join(change_block_lines))
-    changed_ids[current_section].update(ids)
-
-# Remove empty sections
-changed_ids = {section: sorted(list(ids)) for section, ids in changed_ids.items() if ids}
+# Command-line options: semantic diff between two revisions (default) or legacy diff-file scraping
+parser = argparse.ArgumentParser(description="Extract changed IDs per section of repo-shopify-data.")
+parser.add_argument("--base", default=os.getenv("BASE_REF", "origin/main"), help="Old revision (default: origin/main)")
+parser.add_argument("--head", default=os.getenv("HEAD_REF", "origin/int"), help="New revision (default: origin/int)")
+parser.add_argument("--worktree", action="store_true", help="Compare --base against the working tree instead of --head")
+parser.add_argument("--diff-file", nargs="?", const=diff_file_path, default=None,
+                    help="Scrape IDs from a git diff file instead (legacy mode)")
+parser.add_argument("--workers", type=int, default=1, help="Scan the diff file in N worker processes")
+parser.add_argument("--no-cache", action="store_true", help="Do not use the baseline manifest")
+args = parser.parse_args()
+
+metrics = RunMetrics("extractIdByPage")
+
+
+# Function to scrape IDs from the hunks of a git diff file (legacy mode)
+def extract_ids_from_diff_file(diff_file_path, workers=1):
+    # Ensure diff file exists before processing
+    if not os.path.exists(diff_file_path):
+        print(f"❌ Error: Diff file not found at {diff_file_path}")
+        exit(1)
+
+    # Memory-mapped and split at hunk boundaries; large diffs are scanned in parallel
+    return extract_ids(diff_file_path, workers)
+
+
+stage = metrics.begin("diff")
+manifest = None
+if args.diff_file:
+    print(f"📄 Scraping IDs from diff file: {args.diff_file}")
+    changed_ids = extract_ids_from_diff_file(args.diff_file, args.workers)
+    stage.add(bytes=os.path.getsize(args.diff_file))
+else:
+    head_rev = None if args.worktree else args.head
+    print(f"🔍 Comparing repo-shopify-data records: {args.base} → {head_rev or 'working tree'}")
+    stats = {}
+    # Section files hashed by an earlier run (same blob SHA) are not parsed again
+    if not args.no_cache:
+        manifest = BaselineManifest()
+    changes = diff_revisions(args.base, head_rev, stats=stats, hash_cache=manifest)
+    stage.add(records=stats.get("records", 0), bytes=stats.get("bytes", 0))
+    for section, kinds in changes.items():
+        print(f"   {section}: {len(kinds['added'])} added, {len(kinds['modified'])} modified, {len(kinds['removed'])} removed")
+    changed_ids = changed_ids_by_section(changes)
 
 # Write extracted IDs to file
-with open(output_file_path, "w", encoding="utf-8") as output_file:
-    for section, ids in changed_ids.items():
-        output_file.write(f"{section} -> {', '.join(ids)}\n")
+metrics.begin("write").add(records=sum(len(ids) for ids in changed_ids.values()))
+write_changed_ids(output_file_path, changed_ids)
 
 print(f"✅ Extracted IDs written to {output_file_path}")
 
+# The IDs are written: this run's hashes become the baseline of the next one
+if manifest is not None:
+    manifest.save({"base": args.base, "head": head_rev})
+
 # ** Git Handling Logic with Stashing **
+metrics.begin("git")
 try:
     subprocess.run(["git", "config", "--global", "user.name", "github-actions"], check=True)
     subprocess.run(["git", "config", "--global", "user.email", "github-actions@github.com"], check=True)
@@ -107,3 +115,5 @@ try:
 
 except subprocess.CalledProcessError as e:
     print(f"❌ Error during Git operations: {e}")
+
+metrics.finish()
@@ -0,0 +1,120 @@
+from recordgroups import ROW_NUMBER, TOP_ROW, group_records
+
+# Columns every delta row carries so Matrixify can find the record (those present in the section)
+KEY_COLUMNS = ("ID", "Handle", "Path", "File Name", "Command")
+
+# Columns identifying a row inside a multi-row object (the first one is used to pair old and new rows)
+ROW_KEY_COLUMNS = {
+    "Metaobjects": ("Field",),
+    "Menus": ("Menu Item: ID", "Menu Item: Command"),
+    "Custom_Collections": ("Product: ID", "Product: Command"),
+}
+
+# Sections whose rows can be imported on their own (a metaobject row sets one field); other
+# multi-row objects always send all their rows
+PARTIAL_ROW_SECTIONS = {"Metaobjects"}
+
+# Only MERGE leaves the columns that are not in the sheet untouched; other commands get full rows
+DELTA_COMMANDS = {"MERGE"}
+
+_STRUCTURE_COLUMNS = (TOP_ROW, ROW_NUMBER)
+
+
+# Function to pair the rows of an object's old and new version by their row key
+def pair_rows(old_rows, new_rows, row_key):
+    """
+    :return: List of (old row or None, new row) in new-row order, and the number of old rows
+             with no new counterpart
+    """
+    def keyed(rows):
+        seen = {}
+        keys = []
+        for position, row in enumerate(rows):
+            value = row.get(row_key) if row_key else None
+            value = value if value not in (None, "") else f"#{position}"
+            seen[value] = seen.get(value, 0) + 1
+            keys.append((value, seen[value]))
+        return keys
+
+    old_by_key = dict(zip(keyed(old_rows), old_rows))
+    pairs = [(old_by_key.pop(key, None), row) for key, row in zip(keyed(new_rows), new_rows)]
+    return pairs, len(old_by_key)
+
+
+# Function to list the columns whose value differs between two rows (in new-row column order)
+def changed_columns(old_row, new_row, skip=()):
+    columns = [key for key in new_row if key not in skip and (old_row is None or old_row.get(key) != new_row[key])]
+    if old_row is not None:
+        columns += [key for key in old_row if key not in skip and key not in new_row]
+    return columns
+
+
+# Function to reduce one changed object to its key columns plus the columns that changed
+def object_delta(section, old_rows, new_rows):
+    """
+    :param section: Section name (decides the row key of multi-row objects)
+    :param old_rows: Rows of the object at the base revision
+    :param new_rows: Rows of the object at the head revision
+    :return: List of delta rows; full rows when a delta cannot be imported safely (a command
+             other than MERGE, or rows removed from a multi-row object); [] when nothing changed
+    """
+    if any(row.get("Command", "MERGE") not in DELTA_COMMANDS for row in new_rows):
+        return [dict(row) for row in new_rows]
+
+    row_keys = ROW_KEY_COLUMNS.get(section, ()) if len(old_rows) > 1 or len(new_rows) > 1 else ()
+    pairs, dropped = pair_rows(old_rows, new_rows, row_keys[0] if row_keys else None)
+    if dropped:
+        return [dict(row) for row in new_rows]
+
+    fixed = [column for column in KEY_COLUMNS + _STRUCTURE_COLUMNS + row_keys if column in new_rows[0]]
+    changed = {}
+    changed_pairs = []
+    for old_row, new_row in pairs:
+        # Key columns are compared too (a new Handle or redirect Path is a change) but always sent
+        columns = changed_columns(old_row, new_row, skip=_STRUCTURE_COLUMNS)
+        changed.update(dict.fromkeys(columns))
+        changed_pairs.append(bool(columns) or old_row is None)
+    if not changed:
+        return []
+    changed = [column for column in changed if column not in fixed]
+
+    emit = [row for row, is_changed in zip(new_rows, changed_pairs)
+            if is_changed or section not in PARTIAL_ROW_SECTIONS or row.get(TOP_ROW) == "true"]
+    return [{column: row.get(column, "") for column in fixed + list(changed)} for row in emit]
+
+
+# Function to build the field-level delta of every changed section
+def build_delta(old_data, new_data):
+    """
+    Objects found on both sides keep only ID/Handle/Command (or the section's other key
+    columns) and the columns that changed, and are dropped if nothing changed; new objects
+    and DELETE rows are sent as they are. Rows are grouped by column set, one sheet per set:
+    "Pages", "Pages 2", ...
+
+    :param old_data: Dictionary {section: [records]} of the changed IDs at the base revision
+    :param new_data: Dictionary {section: [records]} of the changed IDs at the head revision
+    :return: Dictionary {sheet name: [delta rows]}
+    """
+    sheets = {}
+    for section, records in new_data.items():
+        old_objects = group_records(old_data.get(section, []))
+        new_objects = group_records(records)
+
+        groups = {}
+        for record_id, new_rows in new_objects.items():
+            if record_id in old_objects:
+                rows = object_delta(section, old_objects[record_id], new_rows)
+            else:
+                rows = [dict(row) for row in new_rows]
+            # One object's rows stay together, in the sheet of its first row's columns
+            if rows:
+                groups.setdefault(tuple(rows[0]), []).extend(rows)
+
+        for number, rows in enumerate(sorted(groups.values(), key=len, reverse=True), start=1):
+            sheets[section if number == 1 else f"{section} {number}"[:31]] = rows
+    return sheets
+
+
+# Function to count the cells of a {sheet: [rows]} mapping (to report how much the delta saves)
+def cell_count(data):
+    return sum(len(row) for rows in data.values() for row in rows)
@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import time
+import atexit
+import platform
+from datetime import datetime
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Unix only: on Windows, peak RSS and child CPU time are reported as 0
+
+from sectiondiff import GITHUB_WORKSPACE
+
+# Folder for run reports and profiles (ignored by git, uploaded as a workflow artifact)
+REPORT_DIR = os.getenv("METRICS_DIR", os.path.join(GITHUB_WORKSPACE, "changes", "run-reports"))
+
+# Set to "cprofile" or "pyinstrument" to dump a profile of the whole run next to the report
+PROFILE = os.getenv("METRICS_PROFILE", "").strip().lower()
+
+
+# Function to reset the peak RSS counter of this process (Linux only; False when unsupported)
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# Function to read the peak RSS of this process in MB
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0
+    # ru_maxrss is KB on Linux and bytes on macOS, and never goes down
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def _child_cpu_seconds():
+    if resource is None:
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+# Counters of one named stage
+class Stage:
+    def __init__(self, name):
+        self.name = name
+        self.records = 0
+        self.bytes = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.child_cpu_seconds = 0.0
+        self.peak_rss_mb = 0.0
+
+    # Function to count records and bytes handled by the stage
+    def add(self, records=0, bytes=0):
+        self.records += records
+        self.bytes += bytes
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "child_cpu_seconds": round(self.child_cpu_seconds, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "records": self.records,
+            "bytes": self.bytes,
+        }
+
+
+# Collector of per-stage wall time, CPU time, peak RSS and records/bytes
+class StageRecorder:
+    """
+    Stages may nest; peak RSS is only reset when an outermost stage starts, so a nested
+    stage reports the peak since its outermost stage began.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._depth = 0
+        self._current = None
+        self._current_context = None
+
+    @contextmanager
+    def stage(self, name):
+        stage = Stage(name)
+        self.stages.append(stage)
+        if self._depth == 0:
+            reset_peak_rss()
+        self._depth += 1
+        wall, cpu, child_cpu = time.perf_counter(), time.process_time(), _child_cpu_seconds()
+        try:
+            yield stage
+        finally:
+            stage.wall_seconds = time.perf_counter() - wall
+            stage.cpu_seconds = time.process_time() - cpu
+            stage.child_cpu_seconds = _child_cpu_seconds() - child_cpu
+            stage.peak_rss_mb = peak_rss_mb()
+            self._depth -= 1
+
+    # Function to end the running begin() stage (if any) and start the next one, for linear scripts
+    def begin(self, name):
+        self.end()
+        self._current_context = self.stage(name)
+        self._current = self._current_context.__enter__()
+        return self._current
+
+    # Function to end the running begin() stage
+    def end(self):
+        if self._current_context is not None:
+            context, self._current_context, self._current = self._current_context, None, None
+            context.__exit__(None, None, None)
+
+    def as_list(self):
+        return [stage.as_dict() for stage in self.stages]
+
+    # Function to print the per-stage table
+    def print_summary(self):
+        print("\n⏱️ Stage metrics:")
+        print(f"   {'stage':<12} {'wall ms':>10} {'cpu ms':>10} {'peak MB':>9} {'records':>10} {'bytes':>12}")
+        for stage in self.stages:
+            print(f"   {stage.name:<12} {stage.wall_seconds * 1000:10.1f} {stage.cpu_seconds * 1000:10.1f} "
+                  f"{stage.peak_rss_mb:9.1f} {stage.records:10,} {stage.bytes:12,}")
+
+
+# Metrics of one script run: stages, the run report and the optional profile
+class RunMetrics(StageRecorder):
+    """
+    Usage in an entry point:
+
+        metrics = RunMetrics("extract-changes-only")
+        with metrics.stage("extract") as stage:
+            ...
+            stage.add(records=len(rows))
+        metrics.finish()
+
+    The report is also written if the script exits early (status "incomplete").
+    """
+
+    def __init__(self, script, report_dir=REPORT_DIR, profile=PROFILE):
+        super().__init__()
+        self.script = script
+        self.report_dir = report_dir
+        self.started_at = datetime.now()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._child_cpu = _child_cpu_seconds()
+        self._finished = False
+        self._profile = profile
+        self._profiler = self._start_profiler(profile)
+        atexit.register(self.finish, "incomplete")
+
+    def _start_profiler(self, profile):
+        if profile == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("⚠️ pyinstrument is not installed, falling back to cProfile.")
+                self._profile = profile = "cprofile"
+            else:
+                profiler = Profiler()
+                profiler.start()
+                return profiler
+        if profile == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        return None
+
+    def _stop_profiler(self):
+        if self._profiler is None:
+            return None
+        os.makedirs(self.report_dir, exist_ok=True)
+        if self._profile == "pyinstrument":
+            self._profiler.stop()
+            profile_path = os.path.join(self.report_dir, f"{self.script}.pyinstrument.html")
+            with open(profile_path, "w", encoding="utf-8") as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            profile_path = os.path.join(self.report_dir, f"{self.script}.prof")
+            self._profiler.dump_stats(profile_path)
+        self._profiler = None
+        return profile_path
+
+    # Function to build the machine-readable run report
+    def report(self, status="ok"):
+        return {
+            "script": self.script,
+            "status": status,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "argv": sys.argv[1:],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "wall_seconds": round(time.perf_counter() - self._wall, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu, 4),
+            "child_cpu_seconds": round(_child_cpu_seconds() - self._child_cpu, 4),
+            # Stages reset the kernel's high-water mark, so the run peak is the largest stage peak
+            "peak_rss_mb": round(max([peak_rss_mb()] + [stage.peak_rss_mb for stage in self.stages]), 1),
+            "stages": self.as_list(),
+        }
+
+    # Function to end the run: stop the profiler, write <script>.json and print the stage table
+    def finish(self, status="ok"):
+        if self._finished:
+            return None
+        self._finished = True
+        self.end()
+
+        report = self.report(status)
+        report["profile"] = self._stop_profiler()
+
+        os.makedirs(self.report_dir, exist_ok=True)
+        report_path = os.path.join(self.report_dir, f"{self.script}.json")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+
+        self.print_summary()
+        print(f"📈 Run report written to {report_path}")
+        if report["profile"]:
+            print(f"📈 Profile written to {report['profile']}")
+        return report_path
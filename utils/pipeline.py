@@ -0,0 +1,249 @@
+import os
+import sys
+import argparse
+import subprocess
+
+from changeset import (write_changed_ids, extract_changed_records, write_change_jsons, delete_records,
+                       add_records, print_change_kinds)
+from metrics import RunMetrics, StageRecorder
+from redirects import resolve_change_set
+from references import check_change_set
+from sectiondiff import GITHUB_WORKSPACE, DATA_DIR, diff_revisions, changed_ids_by_section, commit_id
+
+
+# Function to load properties from config.properties
+def load_properties(filepath):
+    properties = {}
+    if not os.path.exists(filepath):
+        print(f"❌ Error: Configuration file {filepath} not found!")
+        exit(1)
+
+    with open(filepath, "r") as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith("#"):  # Ignore empty lines and comments
+                key, value = line.split("=", 1)
+                properties[key.strip()] = value.strip()
+    return properties
+
+
+# Function to load config.properties with its paths resolved (they are relative to utils/)
+def load_config(workspace=GITHUB_WORKSPACE):
+    config = load_properties(os.path.join(workspace, "config.properties"))
+    paths = {}
+    for key in ("FINAL_OUTPUT_DIR", "GIT_DIFF_DIR", "ID_OUTPUT_DIR", "CHANGED_IDS_FILE", "DIFF_FILE"):
+        paths[key] = os.path.normpath(os.path.join(workspace, "utils", config[key]))
+    paths["CHANGE_EXCEL_DIR"] = os.path.join(workspace, "changes", "change-only-excel")
+    paths["FULL_EXPORT_DIR"] = os.path.join(workspace, "final-matrixify-export")
+    return paths
+
+
+# Function to run the diff -> IDs -> changed records -> Excel chain in one process
+def run_pipeline(base_rev, head_rev=None, write_intermediate=False, excel=True, full_export=False,
+                 streaming=False, workers=1, cache=False, workspace=GITHUB_WORKSPACE, metrics=None, delta=False,
+                 flatten_redirects=True, with_dependents=False, max_rows=None, max_mb=None):
+    """
+    :param base_rev: Old revision (e.g. 'origin/main')
+    :param head_rev: New revision (e.g. 'origin/int'); None means the working tree
+    :param write_intermediate: Also write changes.diff, changed_ids.txt and change-only JSONs
+    :param excel: Write the change-only Excel workbook
+    :param full_export: Also export all of repo-shopify-data (working tree) to final-matrixify-export,
+                        replacing the export that was there
+    :param streaming: Write the full export in constant-memory mode
+    :param workers: Process sections in this many worker processes
+    :param cache: Skip Excel exports whose input did not change, reuse rendered sheets from
+                  the build cache (.cache/excel-build) and record hashes of unchanged section
+                  files from the baseline manifest (.cache/baseline), read the working tree
+                  through columnar snapshots (.cache/snapshots) and revisions through ID
+                  indexes (.cache/section-index), and carry large text fields as references
+                  into the blob store (.cache/text-blobs) until written
+    :param workspace: Repository root
+    :param metrics: StageRecorder (or RunMetrics) receiving the stages; a new one if None
+    :param delta: Send only the key columns and the columns that changed (see fielddelta), one
+                  sheet per column set, in the change-only JSONs and Excel workbook
+    :param flatten_redirects: Export redirects whose chain runs through a changed redirect with
+                              their final target (see redirects.resolve_change_set)
+    :param with_dependents: Also export the unchanged objects that reference a changed one
+                            (see references.check_change_set)
+    :param max_rows: Split the full export into workbooks of at most this many data rows (see workbooksplit)
+    :param max_mb: Split the full export into workbooks of at most this much cell text
+    :return: Dictionary with the changes, changed IDs, extracted records, output files and
+             per-stage metrics
+    :raises ValueError: When a changed redirect is part of a loop or shares its path with another,
+                        when the change set leaves a reference dangling, or when one object does
+                        not fit in a split workbook
+    """
+    paths = load_config(workspace)
+    metrics = metrics if metrics is not None else StageRecorder()
+    result = {"files": []}
+    snapshot_dir = os.path.join(workspace, ".cache", "snapshots") if cache else None
+    index_dir = os.path.join(workspace, ".cache", "section-index") if cache else None
+
+    # Stage 1: record-level diff between the two revisions (only sections not in the baseline are parsed)
+    manifest = None
+    if cache:
+        from baseline import BaselineManifest
+        manifest = BaselineManifest(os.path.join(workspace, ".cache", "baseline", "manifest.json"))
+    with metrics.stage("diff") as stage:
+        stats = {}
+        changes = diff_revisions(base_rev, head_rev, workspace, stats=stats, hash_cache=manifest)
+        stage.add(records=stats.get("records", 0), bytes=stats.get("bytes", 0))
+    if manifest is not None:
+        print(f"📒 Baseline manifest: {manifest.hits} section files reused, {manifest.misses} hashed")
+    result["changes"] = changes
+
+    # Stage 1b: references to and from the changed objects (reference indexes cached by content)
+    with metrics.stage("references") as stage:
+        cache_dir = os.path.join(workspace, ".cache", "references") if cache else None
+        dependents = check_change_set(changed_ids_by_section(changes), base_rev, head_rev, workspace, cache_dir)
+        stage.add(records=sum(len(ids) for ids in dependents.values()))
+    if dependents:
+        print(f"🔗 References: {sum(len(ids) for ids in dependents.values())} unchanged objects reference the change set"
+              + (", exported with it" if with_dependents else ""))
+
+    # Stage 2: changed IDs per section
+    with metrics.stage("ids") as stage:
+        changed_ids = changed_ids_by_section(changes)
+        if with_dependents:
+            for section, ids in dependents.items():
+                changed_ids[section] = sorted(set(changed_ids.get(section, ())) | ids)
+        if write_intermediate:
+            write_git_diff(paths["DIFF_FILE"], base_rev, head_rev, workspace)
+            write_changed_ids(paths["CHANGED_IDS_FILE"], changed_ids)
+            result["files"] += [paths["DIFF_FILE"], paths["CHANGED_IDS_FILE"]]
+        stage.add(records=sum(len(ids) for ids in changed_ids.values()))
+    result["changed_ids"] = changed_ids
+
+    # Stage 3: pull the changed records out of the head revision; removed objects become DELETE rows
+    with metrics.stage("extract") as stage:
+        output_data = extract_changed_records(changed_ids, head_rev, workspace, workers, text_blobs=cache,
+                                              snapshot_dir=snapshot_dir, index_dir=index_dir)
+        removed_ids = {section: kinds["removed"] for section, kinds in changes.items() if kinds["removed"]}
+        if removed_ids:
+            add_records(output_data, delete_records(removed_ids, base_rev, workspace))
+        stage.add(records=sum(len(records) for records in output_data.values()))
+
+    # Stage 3a: one-hop redirects; a loop or duplicate path in the change set stops the run here
+    with metrics.stage("redirects") as stage:
+        stage.add(records=resolve_change_set(output_data, changed_ids, head_rev, workspace, flatten_redirects))
+
+    # Stage 3b: keep only the changed columns, compared with the same IDs at the base revision
+    if delta:
+        with metrics.stage("delta") as stage:
+            from fielddelta import build_delta, cell_count
+            old_data = extract_changed_records(changed_ids, base_rev, workspace, workers, text_blobs=cache,
+                                               index_dir=index_dir)
+            full_cells = cell_count(output_data)
+            output_data = build_delta(old_data, output_data)
+            stage.add(records=sum(len(records) for records in output_data.values()))
+            print(f"✂️ Field-level delta: {cell_count(output_data):,} of {full_cells:,} cells kept")
+
+    if write_intermediate:
+        with metrics.stage("write") as stage:
+            written = write_change_jsons(paths["FINAL_OUTPUT_DIR"], output_data)
+            result["files"] += written
+            stage.add(records=sum(len(records) for records in output_data.values()),
+                      bytes=sum(os.path.getsize(file_path) for file_path in written))
+
+    # Stage 4: change-only Excel workbook (pandas is only imported here)
+    if excel:
+        with metrics.stage("excel") as stage:
+            from excelexport import records_to_excel
+            excel_file = records_to_excel(output_data, paths["CHANGE_EXCEL_DIR"], workers, skip_unchanged=cache)
+            if excel_file:
+                result["files"].append(excel_file)
+                stage.add(records=sum(len(records) for records in output_data.values()),
+                          bytes=os.path.getsize(excel_file))
+
+    # Stage 5: full Matrixify export of the checked-out repo-shopify-data
+    if full_export:
+        with metrics.stage("export") as stage:
+            from excelexport import json_to_excel
+            data_dir = os.path.join(workspace, DATA_DIR)
+            cache_dir = os.path.join(workspace, ".cache", "excel-build") if cache else None
+            excel_file = json_to_excel(data_dir, paths["FULL_EXPORT_DIR"],
+                                       streaming=streaming, workers=workers, cache_dir=cache_dir, replace=True,
+                                       max_rows=max_rows, max_mb=max_mb, snapshot_dir=snapshot_dir)
+            if excel_file:
+                result["files"].append(excel_file)
+                stage.add(bytes=sum(os.path.getsize(os.path.join(data_dir, name))
+                                    for name in os.listdir(data_dir) if name.endswith(".json")))
+
+    # Callers get the texts back, not the blob references the stages passed around
+    from textblobs import inline_records
+    result["records"] = {sheet: list(inline_records(records)) for sheet, records in output_data.items()}
+
+    # Every stage succeeded: this run's hashes become the baseline of the next one
+    if cache:
+        from textblobs import prune_blobs
+        prune_blobs()
+    if manifest is not None:
+        manifest.save({
+            "base": base_rev, "base_commit": commit_id(base_rev, workspace),
+            "head": head_rev, "head_commit": commit_id(head_rev, workspace),
+        })
+
+    result["stages"] = metrics.as_list()
+    return result
+
+
+# Function to save the textual git diff of repo-shopify-data (kept for human review only)
+def write_git_diff(diff_file, base_rev, head_rev=None, workspace=GITHUB_WORKSPACE):
+    os.makedirs(os.path.dirname(diff_file), exist_ok=True)
+    revisions = [f"{base_rev}..{head_rev}"] if head_rev else [base_rev]
+    with open(diff_file, "w") as diff_output:
+        subprocess.run(["git", "-C", workspace, "diff"] + revisions + ["--", f"{DATA_DIR}/*.json"],
+                       stdout=diff_output, check=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the change-capture pipeline in a single process.")
+    parser.add_argument("--base", default=os.getenv("BASE_REF", "origin/main"), help="Old revision (default: origin/main)")
+    parser.add_argument("--head", default=os.getenv("HEAD_REF", "origin/int"), help="New revision (default: origin/int)")
+    parser.add_argument("--worktree", action="store_true", help="Compare --base against the working tree instead of --head")
+    parser.add_argument("--write-intermediate", action="store_true",
+                        help="Also write changes.diff, changed_ids.txt and the change-only JSON files")
+    parser.add_argument("--no-excel", action="store_true", help="Skip the change-only Excel workbook")
+    parser.add_argument("--full-export", action="store_true",
+                        help="Also export all of repo-shopify-data to final-matrixify-export")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Write the full export row by row in constant-memory mode")
+    parser.add_argument("--workers", type=int, default=1, help="Process sections in N worker processes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always rebuild the Excel files instead of skipping unchanged input, and use nothing under .cache")
+    parser.add_argument("--delta", action="store_true",
+                        help="Write only ID/Handle/Command and the changed columns of modified records")
+    parser.add_argument("--keep-redirect-chains", action="store_true",
+                        help="Export redirects as they are instead of flattening chains to one hop")
+    parser.add_argument("--with-dependents", action="store_true",
+                        help="Also export unchanged objects that reference a changed one")
+    parser.add_argument("--max-rows", type=int,
+                        help="Split the full export into workbooks of at most N data rows (whole objects)")
+    parser.add_argument("--max-mb", type=float, help="Split the full export into workbooks of at most N MB of cell text")
+    args = parser.parse_args()
+
+    head_rev = None if args.worktree else args.head
+    print(f"🚀 Capturing changes: {args.base} → {head_rev or 'working tree'}")
+
+    metrics = RunMetrics("pipeline")
+    try:
+        result = run_pipeline(args.base, head_rev, args.write_intermediate, not args.no_excel, args.full_export,
+                              args.streaming, args.workers, not args.no_cache, metrics=metrics, delta=args.delta,
+                              flatten_redirects=not args.keep_redirect_chains, with_dependents=args.with_dependents,
+                              max_rows=args.max_rows, max_mb=args.max_mb)
+    except ValueError as e:
+        print(f"❌ Pipeline aborted: {e}")
+        metrics.finish("failed")
+        sys.exit(1)
+
+    print_change_kinds(result["changes"])
+    for section, ids in result["changed_ids"].items():
+        rows = sum(len(records) for sheet, records in result["records"].items()
+                   if sheet == section or sheet.startswith(f"{section} "))
+        print(f"✅ {section}: {len(ids)} changed IDs, {rows} rows to export")
+    if not result["changed_ids"]:
+        print("✅ No JSON records changed.")
+    for file_path in result["files"]:
+        print(f"📄 Wrote {file_path}")
+
+    metrics.finish()
@@ -0,0 +1,174 @@
+import os
+import json
+import glob
+import tempfile
+
+from canonical import canonical_record, record_text
+from recordgroups import ROW_NUMBER, TOP_ROW, group_records, iter_runs
+from sectionstream import iter_records, iter_spans
+
+
+# Function to compare two versions of an object, ignoring the running Row # (like sectiondiff)
+def same_object(old_rows, new_rows):
+    if len(old_rows) != len(new_rows):
+        return False
+    strip = lambda row: {key: value for key, value in row.items() if key != ROW_NUMBER}
+    return all(strip(old) == strip(new) for old, new in zip(old_rows, new_rows))
+
+
+# Function to check imported records before they replace anything
+def validate_records(section, records, known_columns):
+    """
+    :param section: Section name (for messages)
+    :param records: Imported records
+    :param known_columns: Columns of the current section file (empty for a new section)
+    :return: (errors, warnings), lists of messages; any error blocks the promotion
+    """
+    errors, warnings = [], []
+    for position, record in enumerate(records, start=1):
+        if not isinstance(record, dict) or record.get("ID") in (None, ""):
+            errors.append(f"{section}: record {position} has no ID")
+    if errors:
+        return errors, warnings
+
+    columns = set()
+    for record in records:
+        columns.update(record)
+    missing = [column for column in known_columns if column not in columns]
+    if records and missing:
+        errors.append(f"{section}: columns missing from the import: {', '.join(missing)}")
+    extra = sorted(columns - set(known_columns)) if known_columns else []
+    if extra:
+        warnings.append(f"{section}: new columns: {', '.join(extra)}")
+
+    # An ID may span several rows only as one contiguous run of a multi-row section
+    runs = {}
+    for record_id, rows in iter_runs(records):
+        runs[record_id] = runs.get(record_id, 0) + (1 if TOP_ROW in columns else len(rows))
+    duplicates = sorted(record_id for record_id, count in runs.items() if count > 1)
+    if duplicates:
+        errors.append(f"{section}: duplicate IDs: {', '.join(duplicates[:20])}"
+                      + (f" (+{len(duplicates) - 20} more)" if len(duplicates) > 20 else ""))
+    return errors, warnings
+
+
+# Function to serialize one record exactly like json.dump(records, f, indent=4) would inside the array
+def _record_text(record):
+    return record_text(record, level=1).encode("ascii")
+
+
+# Function to work out the merged content of one section file without writing it
+def plan_section(source_file, target_file, prune=False, apply_deletes=False):
+    """
+    Objects are matched by ID. Unchanged objects keep their exact bytes and position,
+    changed ones are replaced in place and new ones are appended. With prune, objects missing
+    from the import are removed (the import is then a complete copy of the section). Rows
+    with Command DELETE are stored like any other row, unless apply_deletes removes their
+    objects instead.
+
+    :return: Dictionary with 'section', 'target', 'data' (bytes to write, None when the file
+             would not change), counts and 'errors'/'warnings'
+    """
+    section = os.path.splitext(os.path.basename(source_file))[0]
+    plan = {"section": section, "target": target_file, "data": None,
+            "added": 0, "updated": 0, "deleted": 0, "kept": 0, "errors": [], "warnings": []}
+
+    # Imported records are compared and written in canonical form (column order, values)
+    new_records = [canonical_record(record, section) if isinstance(record, dict) else record
+                   for record in iter_records(source_file)]
+    old_spans = list(iter_spans(target_file)) if os.path.exists(target_file) else []
+    known_columns = list(dict.fromkeys(key for record, _, _ in old_spans for key in record))
+    plan["errors"], plan["warnings"] = validate_records(section, new_records, known_columns)
+    if plan["errors"]:
+        return plan
+
+    old_bytes = b""
+    if os.path.exists(target_file):
+        with open(target_file, "rb") as f:
+            old_bytes = f.read()
+    old_objects = {}
+    for record, start, end in old_spans:
+        old_objects.setdefault(str(record.get("ID")), []).append((record, old_bytes[start:end]))
+    new_objects = group_records(new_records)
+    deleting = lambda rows: apply_deletes and any(row.get("Command") == "DELETE" for row in rows)
+
+    pieces = []
+    for record_id, old_rows in old_objects.items():
+        new_rows = new_objects.get(record_id)
+        if new_rows is None:
+            if prune:
+                plan["deleted"] += 1
+            else:
+                pieces += [raw for _, raw in old_rows]
+                plan["kept"] += 1
+        elif deleting(new_rows):
+            plan["deleted"] += 1
+        elif same_object([record for record, _ in old_rows], new_rows):
+            pieces += [raw for _, raw in old_rows]
+            plan["kept"] += 1
+        else:
+            pieces += [_record_text(row) for row in new_rows]
+            plan["updated"] += 1
+
+    for record_id, new_rows in new_objects.items():
+        if record_id not in old_objects and not deleting(new_rows):
+            pieces += [_record_text(row) for row in new_rows]
+            plan["added"] += 1
+
+    data = b"[\n    " + b",\n    ".join(pieces) + b"\n]" if pieces else b"[]"
+
+    # The merged file must parse back to the expected number of records
+    if len(json.loads(data)) != len(pieces):
+        plan["errors"].append(f"{section}: merged file does not parse back to {len(pieces)} records")
+    elif data != old_bytes:
+        plan["data"] = data
+    return plan
+
+
+# Function to replace a file atomically (temp file + rename)
+def write_atomic(file_path, data):
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Function to merge imported section files into repo-shopify-data
+def promote(source_dir, target_dir, prune=False, apply_deletes=False):
+    """
+    Every section is validated and merged first; nothing is written unless all of them pass.
+
+    :param source_dir: Folder with the imported JSON files (e.g. output_json)
+    :param target_dir: Folder to update (repo-shopify-data)
+    :param prune: Remove objects that are missing from the import
+    :param apply_deletes: Remove objects whose imported rows have Command DELETE
+    :return: List of plans (see plan_section)
+    :raises ValueError: When any section fails validation
+    """
+    plans = [
+        plan_section(source_file, os.path.join(target_dir, os.path.basename(source_file)), prune, apply_deletes)
+        for source_file in sorted(glob.glob(os.path.join(source_dir, "*.json")))
+    ]
+
+    for plan in plans:
+        for warning in plan["warnings"]:
+            print(f"⚠️ {warning}")
+    errors = [error for plan in plans for error in plan["errors"]]
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        raise ValueError(f"{len(errors)} validation error(s); nothing was promoted")
+
+    for plan in plans:
+        counts = f"{plan['added']} added, {plan['updated']} updated, {plan['deleted']} deleted, {plan['kept']} unchanged"
+        if plan["data"] is None:
+            print(f"✅ {plan['section']}: no changes ({counts})")
+            continue
+        write_atomic(plan["target"], plan["data"])
+        print(f"✅ {plan['section']}: {counts} -> {plan['target']}")
+    return plans
@@ -0,0 +1,87 @@
+# Column holding a row's position in a multi-row export (a running number across the whole file)
+ROW_NUMBER = "Row #"
+
+# Column marking the first row of a multi-row object
+TOP_ROW = "Top Row"
+
+
+# Function to read the Row # of a record as an int (None when missing or not a number)
+def row_number(record):
+    value = record.get(ROW_NUMBER)
+    if value is None or value == "":
+        return None
+    try:
+        return int(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+# Function to put the rows of one object in Row # order (rows without a Row # keep their place at the end)
+def sort_rows(rows):
+    if len(rows) < 2:
+        return rows
+    numbers = [row_number(row) for row in rows]
+    if all(number is None for number in numbers) or numbers == sorted(numbers, key=_number_key):
+        return rows
+    order = sorted(range(len(rows)), key=lambda position: _number_key(numbers[position]))
+    return [rows[position] for position in order]
+
+
+def _number_key(number):
+    return (number is None, number or 0)
+
+
+# Function to split a stream of records into runs of consecutive rows sharing an ID
+def iter_runs(records):
+    """
+    Metaobjects, Menus and Custom_Collections store one object as several consecutive rows
+    with the same ID. Single-row sections yield one run per record.
+
+    :param records: Iterable of JSON records
+    :return: Generator of (ID, [rows in Row # order]), one per contiguous run, in file order
+    """
+    current_id = None
+    rows = []
+    for record in records:
+        record_id = str(record.get("ID"))
+        if rows and record_id != current_id:
+            yield current_id, sort_rows(rows)
+            rows = []
+        current_id = record_id
+        rows.append(record)
+    if rows:
+        yield current_id, sort_rows(rows)
+
+
+# Function to build the ID -> [rows] model of a section in one pass
+def group_records(records):
+    """
+    Rows of an ID that are not contiguous in the file (e.g. a hand-edited section) are
+    merged into one object and reported.
+
+    :param records: Iterable of JSON records
+    :return: Dictionary {ID: [rows in Row # order]} in order of first appearance
+    """
+    groups = {}
+    split_ids = []
+    for record_id, rows in iter_runs(records):
+        if record_id in groups:
+            groups[record_id] = sort_rows(groups[record_id] + rows)
+            split_ids.append(record_id)
+        else:
+            groups[record_id] = rows
+
+    if split_ids:
+        print(f"⚠️ Rows of {len(split_ids)} IDs are not contiguous and were regrouped: {', '.join(sorted(set(split_ids)))}")
+    return groups
+
+
+# Function to flatten grouped objects back into a list of rows
+def flatten(groups):
+    return [row for rows in groups.values() for row in rows]
+
+
+# Function to stream rows object by object, each object's rows in Row # order
+def iter_object_rows(records):
+    for _, rows in iter_runs(records):
+        yield from rows
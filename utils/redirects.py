@@ -0,0 +1,242 @@
+from sectiondiff import GITHUB_WORKSPACE, DATA_DIR, load_section
+
+REDIRECTS_SECTION = "Redirects"
+
+# Storefront routes that always resolve, so a redirect from them never fires
+# (Shopify only redirects paths that would otherwise be a 404)
+BUILTIN_ROUTES = ("/", "/account", "/cart", "/checkout", "/search", "/collections", "/collections/all",
+                  "/products", "/pages", "/blogs", "/policies")
+BUILTIN_PREFIXES = ("/account/", "/checkouts/", "/policies/")
+
+
+# Function to split a redirect path or target into (match key, fragment)
+def path_key(path):
+    """
+    Shopify matches redirect paths without regard to case or a trailing slash; the query
+    string is part of the match and the fragment never reaches the server.
+
+    :param path: Path or Target as written in Redirects.json (e.g. "/Member/?a=1#top")
+    :return: ("/member?a=1", "#top"); the key is None for absolute URLs (other hosts)
+    """
+    path, hash_sign, fragment = path.partition("#")
+    if not path.startswith("/") or path.startswith("//"):
+        return None, hash_sign + fragment
+    path, question_mark, query = path.partition("?")
+    path = path.lower().rstrip("/") or "/"
+    return path + question_mark + query, hash_sign + fragment
+
+
+# Function to collect the paths served by live resources (redirects from them never fire)
+def live_paths(rev=None, workspace=GITHUB_WORKSPACE):
+    paths = set()
+    for section, prefix in (("Pages", "/pages/"), ("Custom_Collections", "/collections/")):
+        for record in load_section(f"{DATA_DIR}/{section}.json", rev, workspace):
+            handle = record.get("Handle")
+            if handle and record.get("Command") != "DELETE":
+                paths.add(prefix + str(handle).lower())
+    return paths
+
+
+# Hash map from redirect path to target, with chain, loop and duplicate analysis
+class RedirectIndex:
+    """
+    Every analysis is one pass over the redirects: each path is resolved once and memoized,
+    so flattening tens of thousands of redirects stays linear.
+
+    Usage:
+
+        index = RedirectIndex(load_section("repo-shopify-data/Redirects.json"), live_paths())
+        index.cycles()             # [[path, ...], ...]
+        index.resolved(record)     # one-hop Target for a record
+    """
+
+    def __init__(self, records, live=()):
+        self.records = list(records)
+        self.live = set(live)
+        self.rows_by_path = {}
+        for record in self.records:
+            key, _ = path_key(str(record.get("Path", "")))
+            if key is not None:
+                self.rows_by_path.setdefault(key, []).append(record)
+        self._final = {}
+        self._looping = set()
+        self._resolve_all()
+
+    # Function to get the redirect that fires for a path key, or None
+    def redirect_at(self, key):
+        if key is None or key in self.live or key in BUILTIN_ROUTES or key.startswith(BUILTIN_PREFIXES):
+            return None
+        rows = self.rows_by_path.get(key)
+        # With duplicate paths the first row wins (Shopify rejects the others on import)
+        return rows[0] if rows else None
+
+    # Function to resolve every path key once (iterative, memoized; marks keys on or into a loop)
+    def _resolve_all(self):
+        for start in self.rows_by_path:
+            if start in self._final or start in self._looping:
+                continue
+            trail, on_trail = [], set()
+            key = start
+            while True:
+                record = self.redirect_at(key)
+                if record is None or key in self._final or key in self._looping:
+                    break
+                if key in on_trail:
+                    # A loop: everything on the trail from here on can never resolve
+                    self._looping.update(trail)
+                    trail = []
+                    break
+                trail.append(key)
+                on_trail.add(key)
+                key, _ = path_key(str(record.get("Target", "")))
+
+            # Unwind: each key's final target is its own target resolved further
+            for key in reversed(trail):
+                if key in self._looping:
+                    continue
+                target = str(self.redirect_at(key).get("Target", ""))
+                next_key, fragment = path_key(target)
+                if next_key in self._looping:
+                    self._looping.add(key)
+                    continue
+                self._final[key] = self._combine(target, next_key, fragment)
+
+    # Function to join a target with the final target of the path it points to (the target itself when that path does not redirect)
+    def _combine(self, target, next_key, fragment):
+        if self.redirect_at(next_key) is None:
+            return target
+        final = self._final[next_key]
+        # The browser carries a fragment across redirects unless a later hop sets its own
+        return final if "#" in final or not fragment else final + fragment
+
+    # Function to get the one-hop Target of a record (None when it leads into a loop)
+    def resolved(self, record):
+        target = str(record.get("Target", ""))
+        next_key, fragment = path_key(target)
+        if next_key in self._looping:
+            return None
+        return self._combine(target, next_key, fragment)
+
+    # Function to list the path keys shared by more than one redirect
+    def duplicates(self):
+        return {key: rows for key, rows in self.rows_by_path.items() if len(rows) > 1}
+
+    # Function to list the loops, each as the path keys on it in redirect order
+    def cycles(self):
+        cycles, seen = [], set()
+        for start in sorted(self._looping):
+            if start in seen:
+                continue
+            # Walk until a key repeats; the repeat closes the loop
+            order, positions, key = [], {}, start
+            while key not in positions:
+                positions[key] = len(order)
+                order.append(key)
+                key, _ = path_key(str(self.redirect_at(key).get("Target", "")))
+            cycle = order[positions[key]:]
+            if not seen.intersection(cycle):
+                cycles.append(cycle)
+            seen.update(order)
+        return cycles
+
+    # Function to list the records whose target redirects again, with their one-hop target
+    def chains(self):
+        """
+        :return: List of (record, resolved Target); records leading into a loop are not included
+        """
+        chained = []
+        for record in self.records:
+            target = self.resolved(record)
+            if target is not None and target != record.get("Target"):
+                chained.append((record, target))
+        return chained
+
+    # Function to get the records that lead into a loop
+    def looping_records(self):
+        return [record for record in self.records if self.resolved(record) is None]
+
+    # Function to find the path keys whose chain runs through one of the given keys (themselves included)
+    def keys_leading_to(self, keys):
+        reached = {}
+        for start in self.rows_by_path:
+            trail, key = [], start
+            while key not in reached and key not in self._looping and self.redirect_at(key) is not None:
+                trail.append(key)
+                key, _ = path_key(str(self.redirect_at(key).get("Target", "")))
+            hit = reached.get(key, key in keys)
+            for key in reversed(trail):
+                hit = hit or key in keys
+                reached[key] = hit
+        return {key for key, hit in reached.items() if hit}
+
+
+# Function to check the redirects of a change set and flatten the chains it creates or changes
+def resolve_change_set(output_data, changed_ids, head_rev=None, workspace=GITHUB_WORKSPACE, flatten=True):
+    """
+    The whole Redirects section of the head revision is indexed. Loops and duplicate paths
+    that involve a changed redirect are errors; older ones are only reported. With flatten,
+    every redirect whose chain runs through a changed redirect is exported with its final
+    target (its row is added to the change set when it was not changed itself).
+
+    :param output_data: Dictionary {section: [records]} to update in place
+    :param changed_ids: Dictionary {section: collection of IDs}
+    :return: Number of flattened rows
+    :raises ValueError: When a changed redirect is part of a loop or shares its path
+    """
+    ids = {str(record_id) for record_id in changed_ids.get(REDIRECTS_SECTION, ())}
+    if not ids:
+        return 0
+
+    index = RedirectIndex(load_section(f"{DATA_DIR}/{REDIRECTS_SECTION}.json", head_rev, workspace),
+                          live_paths(head_rev, workspace))
+    changed_keys = {path_key(str(record.get("Path", "")))[0] for record in index.records
+                    if str(record.get("ID")) in ids}
+
+    errors = []
+    on_cycles = set()
+    for cycle in index.cycles():
+        on_cycles.update(cycle)
+        message = f"redirect loop: {' -> '.join(cycle + cycle[:1])}"
+        if changed_keys.intersection(cycle):
+            errors.append(message)
+        else:
+            print(f"⚠️ Existing {message}")
+    for record in index.looping_records():
+        key = path_key(str(record.get("Path", "")))[0]
+        if str(record.get("ID")) in ids and key not in on_cycles:
+            errors.append(f"redirect {record.get('Path')} -> {record.get('Target')} leads into a loop")
+    for key, rows in index.duplicates().items():
+        message = f"duplicate redirect path {key} (IDs {', '.join(str(row.get('ID')) for row in rows)})"
+        if key in changed_keys:
+            errors.append(message)
+        else:
+            print(f"⚠️ Existing {message}")
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        raise ValueError(f"{len(errors)} redirect error(s) in the change set")
+
+    if not flatten:
+        return 0
+
+    # A chain needs a new target when it was changed itself or any later hop was changed
+    through_changed = index.keys_leading_to(changed_keys)
+    rows = output_data.setdefault(REDIRECTS_SECTION, [])
+    positions = {str(row.get("ID")): position for position, row in enumerate(rows)}
+    flattened = 0
+    for record, target in index.chains():
+        next_key, _ = path_key(str(record.get("Target", "")))
+        if str(record.get("ID")) not in ids and next_key not in through_changed:
+            continue
+        row = dict(record, Target=target)
+        position = positions.get(str(record.get("ID")))
+        if position is None:
+            rows.append(row)
+        else:
+            rows[position] = dict(rows[position], Target=target)
+        flattened += 1
+    if not rows:
+        del output_data[REDIRECTS_SECTION]
+    if flattened:
+        print(f"↪️ Redirects: {flattened} chain(s) flattened to one hop")
+    return flattened
@@ -0,0 +1,294 @@
+import os
+import re
+import json
+import glob
+import hashlib
+import tempfile
+
+from sectiondiff import GITHUB_WORKSPACE, list_sections, blob_id, iter_section
+
+# Folder holding one reference index per set of section contents (not tracked in git)
+REFERENCE_DIR = os.path.join(GITHUB_WORKSPACE, ".cache", "references")
+
+# Bump when the index layout or the way references are found changes
+REFERENCES_VERSION = 2
+
+# Cached indexes kept after a save (a run uses two: base and head)
+KEEP_INDEXES = 4
+
+# Metafield columns whose type names the section they point to ("[list.page_reference]" too)
+METAFIELD_TYPE = re.compile(r"^Metafield: .+ \[(?:list\.)?(\w+)\]$")
+REFERENCE_TYPES = {
+    "metaobject_reference": "Metaobjects",
+    "page_reference": "Pages",
+    "collection_reference": "Custom_Collections",
+    "file_reference": "Files",
+}
+
+# Menu item resource types stored in repo-shopify-data, referenced by ID
+MENU_RESOURCE_TYPES = {"PAGE": "Pages", "COLLECTION": "Custom_Collections"}
+
+# Metaobject field values that name a file ("a.jpg" or "a.jpg, b.png")
+FILE_NAME = re.compile(r"\.(?:jpe?g|png|gif|svg|webp|avif|mp4|mov|webm|pdf)$", re.IGNORECASE)
+
+# Metaobject field values that may name a metaobject ("pricebook.mb-7-49-79-15-pb")
+METAOBJECT_NAME = re.compile(r"^[\w-]+\.[\w-]+$")
+
+# Field values holding one of these are URLs or paths, never a guessed reference ("https://cdn.../a.png")
+NOT_A_NAME = re.compile(r"[/:]")
+
+# Sections whose objects are never in repo-shopify-data; references to them are kept but not checked
+EXTERNAL_SECTIONS = {"Products"}
+
+
+# Function to get the names other sections use for an object of a section
+def object_keys(section, record):
+    """
+    Metaobjects are referenced as "<definition handle>.<handle>", pages and collections by
+    handle and files by file name. The ID is not included (every object has it).
+    """
+    if section == "Metaobjects":
+        if record.get("Definition: Handle") and record.get("Handle"):
+            return [f"{record['Definition: Handle']}.{record['Handle']}"]
+    elif section in ("Pages", "Custom_Collections"):
+        if record.get("Handle"):
+            return [str(record["Handle"])]
+    elif section == "Files":
+        if record.get("File Name"):
+            return [str(record["File Name"])]
+    return []
+
+
+# Function to split a reference cell into the names it holds (lists are comma or newline separated)
+def split_values(value):
+    if isinstance(value, str) and value.startswith("["):
+        try:
+            items = json.loads(value)
+            if isinstance(items, list):
+                return [str(item) for item in items if item not in (None, "")]
+        except ValueError:
+            pass
+    return [item.strip() for item in re.split(r"[,\n]", str(value)) if item.strip()]
+
+
+# Function to list the references one row makes, as (column, target section, name, guessed)
+def row_references(section, record):
+    """
+    Typed references (metafields of a *_reference type, menu item resources, collection
+    products) are certain. Metaobject field types are not exported, so in field values names
+    that look like a file ("a.jpg") or a metaobject ("definition.handle") are guessed
+    references; values holding "/" or ":" (URLs, paths) never are. build_references drops
+    the metaobject-like ones whose definition does not exist.
+    """
+    references = []
+    if section == "Menus":
+        target = MENU_RESOURCE_TYPES.get(record.get("Menu Item: Resource Type"))
+        if target and record.get("Menu Item: Resource ID"):
+            references.append(("Menu Item: Resource ID", target, str(record["Menu Item: Resource ID"]), False))
+    elif section == "Custom_Collections":
+        if record.get("Product: ID"):
+            references.append(("Product: ID", "Products", str(record["Product: ID"]), False))
+    elif section == "Metaobjects":
+        value = record.get("Value")
+        if value and isinstance(value, str):
+            for item in split_values(value):
+                if NOT_A_NAME.search(item):
+                    continue
+                if FILE_NAME.search(item):
+                    references.append((record.get("Field") or "Value", "Files", item, True))
+                elif METAOBJECT_NAME.match(item):
+                    references.append((record.get("Field") or "Value", "Metaobjects", item, True))
+
+    for column, value in record.items():
+        if not value or not column.startswith("Metafield: "):
+            continue
+        match = METAFIELD_TYPE.match(column)
+        target = REFERENCE_TYPES.get(match.group(1)) if match else None
+        if target:
+            references.extend((column, target, item, False) for item in split_values(value))
+    return references
+
+
+# Function to build the reference index of a revision in one pass over its sections
+def build_references(rev=None, workspace=GITHUB_WORKSPACE):
+    """
+    :return: Dictionary with 'keys' {section: {name: ID}} and 'references'
+             [[source section, source ID, column, target section, name, guessed], ...]
+    """
+    keys, references, definitions = {}, [], set()
+    for section, path in list_sections(rev, workspace).items():
+        section_keys = keys.setdefault(section, {})
+        for record in iter_section(path, rev, workspace):
+            record_id = str(record.get("ID"))
+            section_keys[record_id] = record_id
+            for name in object_keys(section, record):
+                section_keys.setdefault(name, record_id)
+            if section == "Metaobjects" and record.get("Definition: Handle"):
+                definitions.add(record["Definition: Handle"])
+            for column, target, name, guessed in row_references(section, record):
+                references.append([section, record_id, column, target, name, guessed])
+
+    # A metaobject-like field value is a reference only if its definition exists
+    references = [reference for reference in references
+                  if not (reference[0] == "Metaobjects" and reference[3] == "Metaobjects"
+                          and reference[4].partition(".")[0] not in definitions)]
+    return {"keys": keys, "references": references}
+
+
+# Function to derive the cache key of a revision's sections (their git blob SHAs)
+def references_key(rev=None, workspace=GITHUB_WORKSPACE):
+    digest = hashlib.sha256(f"references v{REFERENCES_VERSION}\n".encode())
+    for section, path in list_sections(rev, workspace).items():
+        digest.update(f"{section}\t{blob_id(path, rev, workspace)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Function to load the reference index of a revision from the cache, building it on a miss
+def load_references(rev=None, workspace=GITHUB_WORKSPACE, cache_dir=REFERENCE_DIR):
+    """
+    :param cache_dir: Folder of cached indexes (None: always build)
+    :return: ReferenceIndex
+    """
+    if cache_dir is None:
+        return ReferenceIndex(build_references(rev, workspace))
+
+    cache_file = os.path.join(cache_dir, f"{references_key(rev, workspace)}.json")
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        os.utime(cache_file)
+        return ReferenceIndex(data)
+    except (OSError, ValueError):
+        pass
+
+    data = build_references(rev, workspace)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    # Keep only the most recently used indexes
+    cached = sorted(glob.glob(os.path.join(cache_dir, "*.json")), key=os.path.getmtime, reverse=True)
+    for stale in cached[KEEP_INDEXES:]:
+        os.remove(stale)
+    return ReferenceIndex(data)
+
+
+# Forward and reverse references between the objects of one revision
+class ReferenceIndex:
+    """
+    Every lookup is a dictionary access, so checking a change set costs O(changed objects).
+
+    Usage:
+
+        index = load_references("origin/int")
+        index.dependents("Metaobjects", "102993264921")   # [(section, ID, column, name), ...]
+        index.dangling_from("Pages", "143529181465")      # references that resolve to nothing
+    """
+
+    def __init__(self, data):
+        self.keys = data["keys"]
+        self.references = data["references"]
+        self.by_target = {}
+        self.by_source = {}
+        self.names_by_id = {}
+        for reference in self.references:
+            source_section, source_id, column, target, name, _ = reference
+            self.by_target.setdefault((target, name), []).append(reference)
+            self.by_source.setdefault((source_section, source_id), []).append(reference)
+        for section, names in self.keys.items():
+            for name, record_id in names.items():
+                self.names_by_id.setdefault((section, record_id), []).append(name)
+
+    # Function to resolve a name to the ID of the object it names (None when it names nothing)
+    def resolve(self, section, name):
+        return self.keys.get(section, {}).get(name)
+
+    # Function to check whether an object exists in this revision
+    def exists(self, section, record_id):
+        return (section, str(record_id)) in self.names_by_id
+
+    # Function to get the names an object is referenced by (its ID included)
+    def names(self, section, record_id):
+        return self.names_by_id.get((section, str(record_id)), [])
+
+    # Function to list the objects referencing any of the given names of a section
+    def referencing(self, section, names):
+        """
+        :return: List of (source section, source ID, column, name, guessed)
+        """
+        found = []
+        for name in names:
+            for source_section, source_id, column, _, _, guessed in self.by_target.get((section, name), ()):
+                found.append((source_section, source_id, column, name, guessed))
+        return found
+
+    # Function to list the objects referencing an object
+    def dependents(self, section, record_id):
+        return self.referencing(section, self.names(section, record_id))
+
+    # Function to list the references of an object that resolve to nothing
+    def dangling_from(self, section, record_id):
+        """
+        :return: List of (column, target section, name, guessed)
+        """
+        return [(column, target, name, guessed)
+                for _, _, column, target, name, guessed in self.by_source.get((section, str(record_id)), ())
+                if target not in EXTERNAL_SECTIONS and self.resolve(target, name) is None]
+
+    # Function to list every reference that resolves to nothing
+    def dangling(self):
+        return [reference for reference in self.references
+                if reference[3] not in EXTERNAL_SECTIONS and self.resolve(reference[3], reference[4]) is None]
+
+
+# Function to validate the references of a change set and find the objects depending on it
+def check_change_set(changed_ids, base_rev, head_rev=None, workspace=GITHUB_WORKSPACE, cache_dir=REFERENCE_DIR):
+    """
+    A change set may not add a reference to an object that does not exist, nor delete or
+    rename an object that something at the head revision still references by its old name.
+    Only typed references stop the run; a guessed one (see row_references) is a warning.
+
+    :param changed_ids: Dictionary {section: collection of IDs}
+    :param cache_dir: Folder of cached indexes (None: always build)
+    :return: Dictionary {section: set of IDs} of the unchanged objects referencing a changed one
+    :raises ValueError: When the change set leaves a reference dangling
+    """
+    if not changed_ids:
+        return {}
+    head = load_references(head_rev, workspace, cache_dir)
+    base = load_references(base_rev, workspace, cache_dir)
+
+    changed = {section: set(map(str, ids)) for section, ids in changed_ids.items()}
+    errors, warnings = [], []
+    dependents = {}
+    for section, ids in changed.items():
+        for record_id in ids:
+            # References made by the changed object itself
+            for column, target, name, guessed in head.dangling_from(section, record_id):
+                (warnings if guessed else errors).append(
+                    f"{section} {record_id}: {column} -> {target} '{name}' does not exist")
+
+            # References to the changed object, by any name it has or had
+            old_names = [name for name in base.names(section, record_id) if head.resolve(section, name) != record_id]
+            for source_section, source_id, column, name, guessed in head.referencing(section, old_names):
+                if head.resolve(section, name) is None:
+                    what = "deleted" if not head.exists(section, record_id) else "renamed"
+                    (warnings if guessed else errors).append(
+                        f"{source_section} {source_id}: {column} -> {section} '{name}' was {what}")
+            for source_section, source_id, _, _, _ in head.dependents(section, record_id):
+                if source_id not in changed.get(source_section, ()):
+                    dependents.setdefault(source_section, set()).add(source_id)
+
+    for warning in sorted(set(warnings)):
+        print(f"⚠️ {warning} (guessed from the field value, not checked)")
+    if errors:
+        for error in sorted(set(errors)):
+            print(f"❌ {error}")
+        raise ValueError(f"{len(set(errors))} dangling reference(s) in the change set")
+    return dependents
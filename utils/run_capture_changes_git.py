@@ -1,10 +1,8 @@
 import os
-import json
-import glob
 import subprocess
 import shutil
-import pandas as pd
-from datetime import datetime
+
+from metrics import RunMetrics
 
 # Detect if running in GitHub Actions
 GITHUB_WORKSPACE = os.getenv("GITHUB_WORKSPACE", os.getcwd())  # Use GitHub workspace if available
@@ -46,12 +44,16 @@ def clear_directory(dir_path):
     print(f"📂 Creating directory: {dir_path}")
     os.makedirs(dir_path, exist_ok=True)
 
+metrics = RunMetrics("run_capture_changes_git")
+
 # Clear required directories
+metrics.begin("clear")
 clear_directory(FINAL_OUTPUT_DIR)
 clear_directory(GIT_DIFF_DIR)
 clear_directory(ID_OUTPUT_DIR)
 
 # Run git diff and save output
+metrics.begin("git-diff")
 print(f"📄 Running: git diff on {len(REPO_FILES)} files...")
 git_diff_command = ["git", "diff"] + REPO_FILES
 with open(DIFF_FILE, "w") as diff_output:
@@ -68,3 +70,4 @@ print("🔍 Running extract-changes-only.py...")
 #subprocess.run(["python3", os.path.join(GITHUB_WORKSPACE, "extract-changes-only.py")], check=True)
 
 print("🎉 Script execution completed successfully!")
+metrics.finish()
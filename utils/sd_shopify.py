@@ -0,0 +1,328 @@
+import os
+import json
+import sys
+import argparse
+
+# Only the standard library is imported here. Each subcommand imports what it needs when it
+# runs, so diff/ids/extract/promote never load pandas, openpyxl or xlsxwriter
+# (see check_startup.py).
+
+# Repository root (GitHub workspace in Actions, otherwise the parent of utils/)
+WORKSPACE = os.getenv("GITHUB_WORKSPACE", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_BASE = os.getenv("BASE_REF", "origin/main")
+DEFAULT_HEAD = os.getenv("HEAD_REF", "origin/int")
+
+
+def _path(*parts):
+    return os.path.join(WORKSPACE, *parts)
+
+
+def _head(args):
+    return None if args.worktree else args.head
+
+
+# Function to run the record-level diff, reusing the baseline manifest unless --no-cache
+def _diff(args, metrics):
+    from sectiondiff import diff_revisions, commit_id
+
+    manifest = None
+    if not args.no_cache:
+        from baseline import BaselineManifest
+        manifest = BaselineManifest()
+
+    with metrics.stage("diff") as stage:
+        stats = {}
+        changes = diff_revisions(args.base, _head(args), WORKSPACE, stats=stats, hash_cache=manifest)
+        stage.add(records=stats.get("records", 0), bytes=stats.get("bytes", 0))
+    if manifest is not None:
+        manifest.save({"base": args.base, "base_commit": commit_id(args.base, WORKSPACE),
+                       "head": _head(args), "head_commit": commit_id(_head(args), WORKSPACE)})
+    return changes
+
+
+# sd-shopify diff: print added/modified/removed IDs per section
+def cmd_diff(args, metrics):
+    changes = _diff(args, metrics)
+    if args.json:
+        print(json.dumps(changes, indent=4))
+        return 0
+    from changeset import print_change_kinds
+    print_change_kinds(changes)
+    if not changes:
+        print("✅ No JSON records changed.")
+    return 0
+
+
+# sd-shopify ids: write changed_ids.txt
+def cmd_ids(args, metrics):
+    from changeset import write_changed_ids
+    from references import check_change_set
+    from sectiondiff import changed_ids_by_section
+
+    changed_ids = changed_ids_by_section(_diff(args, metrics))
+    with metrics.stage("references") as stage:
+        try:
+            cache_dir = None if args.no_cache else _path(".cache", "references")
+            dependents = check_change_set(changed_ids, args.base, _head(args), WORKSPACE, cache_dir)
+        except ValueError as e:
+            print(f"❌ Aborted: {e}")
+            return 1
+        stage.add(records=sum(len(ids) for ids in dependents.values()))
+    if args.with_dependents:
+        for section, ids in dependents.items():
+            changed_ids[section] = sorted(set(changed_ids.get(section, ())) | ids)
+    with metrics.stage("write") as stage:
+        write_changed_ids(args.output, changed_ids)
+        stage.add(records=sum(len(ids) for ids in changed_ids.values()))
+    print(f"✅ Extracted IDs written to {args.output}")
+    return 0
+
+
+# sd-shopify extract: write the change-only JSON files for the IDs in changed_ids.txt
+def cmd_extract(args, metrics):
+    from changeset import read_changed_ids, extract_changed_records, write_change_jsons, add_deletions
+    from redirects import resolve_change_set
+
+    changed_ids = read_changed_ids(args.ids)
+    head = _head(args)
+
+    with metrics.stage("extract") as stage:
+        snapshot_dir = None if args.no_cache else _path(".cache", "snapshots")
+        index_dir = None if args.no_cache else _path(".cache", "section-index")
+        output_data = extract_changed_records(changed_ids, head, WORKSPACE, args.workers, text_blobs=not args.no_cache,
+                                              snapshot_dir=snapshot_dir, index_dir=index_dir)
+        add_deletions(output_data, changed_ids, args.base, head, WORKSPACE)
+        stage.add(records=sum(len(records) for records in output_data.values()))
+
+    with metrics.stage("redirects") as stage:
+        try:
+            stage.add(records=resolve_change_set(output_data, changed_ids, head, WORKSPACE,
+                                                 flatten=not args.keep_redirect_chains))
+        except ValueError as e:
+            print(f"❌ Extraction aborted: {e}")
+            return 1
+
+    if args.delta:
+        with metrics.stage("delta") as stage:
+            from fielddelta import build_delta
+            old_data = extract_changed_records(changed_ids, args.base, WORKSPACE, args.workers,
+                                               text_blobs=not args.no_cache, index_dir=index_dir)
+            output_data = build_delta(old_data, output_data)
+            stage.add(records=sum(len(records) for records in output_data.values()))
+
+    with metrics.stage("write") as stage:
+        for output_file in write_change_jsons(args.output_dir, output_data):
+            print(f"✅ Wrote {output_file}")
+            stage.add(bytes=os.path.getsize(output_file))
+    if not output_data:
+        print("✅ No relevant JSON changes extracted.")
+    return 0
+
+
+# sd-shopify export: convert a folder of section files into one Matrixify workbook (pandas/xlsxwriter)
+def cmd_export(args, metrics):
+    from excelexport import json_to_excel
+
+    with metrics.stage("export") as stage:
+        cache_dir = None if args.no_cache else _path(".cache", "excel-build")
+        snapshot_dir = None if args.no_cache else _path(".cache", "snapshots")
+        try:
+            excel_file = json_to_excel(args.json_dir, args.output_dir, streaming=args.streaming,
+                                       workers=args.workers, cache_dir=cache_dir, replace=args.replace,
+                                       max_rows=args.max_rows, max_mb=args.max_mb, snapshot_dir=snapshot_dir)
+        except ValueError as e:
+            print(f"❌ Export aborted: {e}")
+            return 1
+        if excel_file and excel_file.endswith(".json"):
+            with open(excel_file, "r", encoding="utf-8") as f:
+                workbooks = json.load(f)["workbooks"]
+            stage.add(records=sum(workbook["rows"] for workbook in workbooks),
+                      bytes=sum(workbook["bytes"] for workbook in workbooks))
+        elif excel_file:
+            stage.add(bytes=os.path.getsize(excel_file))
+    return 0
+
+
+# sd-shopify import: convert a developer-edited workbook back into section files (openpyxl)
+def cmd_import(args, metrics):
+    from excelimport import EXCLUDED_SHEETS, excel_to_json
+
+    with metrics.stage("import") as stage:
+        stage.add(bytes=os.path.getsize(args.workbook))
+        counts = excel_to_json(args.workbook, args.output_dir, EXCLUDED_SHEETS)
+        stage.add(records=sum(counts.values()))
+
+    # Completion marker watched by run_scripts.sh
+    with open(os.path.join(args.output_dir, "convert.json.completed"), "w") as f:
+        f.write("Conversion complete.")
+    print(f"JSON files saved to {args.output_dir} and conversion marker created.")
+    return 0
+
+
+# sd-shopify promote: merge imported section files into repo-shopify-data by ID (validated, atomic)
+def cmd_promote(args, metrics):
+    from promote import promote
+
+    with metrics.stage("promote") as stage:
+        try:
+            plans = promote(args.source_dir, args.target_dir, prune=args.prune,
+                            apply_deletes=args.apply_deletes)
+        except ValueError as e:
+            print(f"❌ Promotion aborted: {e}")
+            return 1
+        stage.add(records=sum(plan["added"] + plan["updated"] + plan["deleted"] for plan in plans),
+                  bytes=sum(len(plan["data"]) for plan in plans if plan["data"] is not None))
+    return 0
+
+
+# sd-shopify redirects: report chains, loops and duplicate paths in Redirects.json, optionally flattening the chains
+def cmd_redirects(args, metrics):
+    from redirects import REDIRECTS_SECTION, RedirectIndex, live_paths
+    from sectiondiff import DATA_DIR, load_section
+
+    path = f"{DATA_DIR}/{REDIRECTS_SECTION}.json"
+    if args.flatten and args.head is not None:
+        print("❌ --flatten rewrites the working tree; run it without --head")
+        return 2
+    with metrics.stage("redirects") as stage:
+        index = RedirectIndex(load_section(path, _head(args), WORKSPACE), live_paths(_head(args), WORKSPACE))
+        chains, cycles, duplicates = index.chains(), index.cycles(), index.duplicates()
+        stage.add(records=len(index.records))
+
+    for record, target in chains:
+        print(f"↪️ {record.get('Path')}: {record.get('Target')} -> {target}")
+    for cycle in cycles:
+        print(f"❌ Redirect loop: {' -> '.join(cycle + cycle[:1])}")
+    for key, rows in duplicates.items():
+        print(f"❌ Duplicate redirect path {key} (IDs {', '.join(str(row.get('ID')) for row in rows)})")
+    print(f"🔎 {REDIRECTS_SECTION}: {len(index.records)} redirects, {len(chains)} chains, "
+          f"{len(cycles)} loops, {len(duplicates)} duplicate paths")
+
+    if args.flatten and chains:
+        from canonical import write_records
+
+        targets = {id(record): target for record, target in chains}
+        write_records(_path(path), (dict(record, Target=targets[id(record)]) if id(record) in targets else record
+                                    for record in index.records))
+        print(f"✅ {len(chains)} chains flattened in {_path(path)}")
+    return 1 if cycles or duplicates else 0
+
+
+# sd-shopify references: list dangling references, or the objects referencing the given ones
+def cmd_references(args, metrics):
+    from references import load_references
+
+    with metrics.stage("references") as stage:
+        cache_dir = None if args.no_cache else _path(".cache", "references")
+        index = load_references(_head(args), WORKSPACE, cache_dir)
+        stage.add(records=len(index.references))
+
+    if args.of:
+        for target in args.of:
+            section, _, record_id = target.partition(":")
+            dependents = index.dependents(section, record_id)
+            print(f"🔗 {section} {record_id}: referenced by {len(dependents)}")
+            for source_section, source_id, column, name, _ in dependents:
+                print(f"   {source_section} {source_id} ({column} -> '{name}')")
+        return 0
+
+    dangling = index.dangling()
+    for source_section, source_id, column, target, name, guessed in dangling:
+        print(f"{'⚠️' if guessed else '❌'} {source_section} {source_id}: {column} -> {target} '{name}' does not exist")
+    errors = sum(1 for reference in dangling if not reference[5])
+    print(f"🔎 {len(index.references)} references, {len(dangling)} dangling ({errors} typed)")
+    return 1 if errors else 0
+
+
+def _add_revision_options(parser):
+    parser.add_argument("--base", default=DEFAULT_BASE, help=f"Old revision (default: {DEFAULT_BASE})")
+    parser.add_argument("--head", default=DEFAULT_HEAD, help=f"New revision (default: {DEFAULT_HEAD})")
+    parser.add_argument("--worktree", action="store_true", help="Use the working tree instead of --head")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="sd-shopify", description="Change capture and Matrixify tooling for repo-shopify-data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    diff = commands.add_parser("diff", help="Record-level diff of repo-shopify-data between two revisions")
+    _add_revision_options(diff)
+    diff.add_argument("--json", action="store_true", help="Print the diff as JSON")
+    diff.add_argument("--no-cache", action="store_true", help="Do not use the baseline manifest")
+    diff.set_defaults(handler=cmd_diff)
+
+    ids = commands.add_parser("ids", help="Write changed_ids.txt")
+    _add_revision_options(ids)
+    ids.add_argument("--output", default=_path("changes", "id-output", "changed_ids.txt"), help="changed_ids.txt to write")
+    ids.add_argument("--no-cache", action="store_true", help="Do not use the baseline manifest or reference indexes")
+    ids.add_argument("--with-dependents", action="store_true",
+                     help="Also list unchanged objects that reference a changed one")
+    ids.set_defaults(handler=cmd_ids)
+
+    extract = commands.add_parser("extract", help="Write change-only JSON files for the IDs in changed_ids.txt")
+    _add_revision_options(extract)
+    extract.add_argument("--ids", default=_path("changes", "id-output", "changed_ids.txt"), help="changed_ids.txt to read")
+    extract.add_argument("--output-dir", default=_path("changes", "change-only-jsons"), help="Folder for the JSON files")
+    extract.add_argument("--delta", action="store_true", help="Keep only key columns and the columns changed since --base")
+    extract.add_argument("--workers", type=int, default=1, help="Extract sections in N worker processes")
+    extract.add_argument("--no-cache", action="store_true",
+                         help="Keep large text fields in memory instead of the blob store (.cache/text-blobs) "
+                              "and read section files without snapshots or ID indexes (.cache)")
+    extract.add_argument("--keep-redirect-chains", action="store_true",
+                         help="Export redirects as they are instead of flattening chains to one hop")
+    extract.set_defaults(handler=cmd_extract)
+
+    redirects = commands.add_parser("redirects", help="Check Redirects.json for chains, loops and duplicate paths")
+    redirects.add_argument("--head", default=None, help="Revision to check (default: the working tree)")
+    redirects.add_argument("--flatten", action="store_true",
+                           help="Rewrite repo-shopify-data/Redirects.json with every chain flattened to one hop")
+    redirects.set_defaults(handler=cmd_redirects, worktree=False)
+
+    references = commands.add_parser("references", help="Check references between sections (metaobjects, pages, menus, files)")
+    references.add_argument("--head", default=None, help="Revision to check (default: the working tree)")
+    references.add_argument("--of", nargs="+", metavar="SECTION:ID", help="List the objects referencing these instead")
+    references.add_argument("--no-cache", action="store_true", help="Always rebuild the reference index")
+    references.set_defaults(handler=cmd_references, worktree=False)
+
+    export = commands.add_parser("export", help="Convert section files into a Matrixify workbook")
+    export.add_argument("--json-dir", default=_path("repo-shopify-data"), help="Folder with the section files")
+    export.add_argument("--output-dir", default=_path("final-matrixify-export"), help="Folder for the workbook")
+    export.add_argument("--streaming", action="store_true", help="Write rows in constant-memory mode")
+    export.add_argument("--workers", type=int, default=1, help="Process sections in N worker processes")
+    export.add_argument("--no-cache", action="store_true",
+                        help="Always rebuild the workbook, without the build cache or snapshots")
+    export.add_argument("--replace", action="store_true", help="Remove older exports from the output folder")
+    export.add_argument("--max-rows", type=int, help="Split into workbooks of at most N data rows (whole objects)")
+    export.add_argument("--max-mb", type=float, help="Split into workbooks of at most N MB of cell text")
+    export.set_defaults(handler=cmd_export)
+
+    excel_import = commands.add_parser("import", help="Convert a developer-edited workbook into section files")
+    excel_import.add_argument("workbook", help="Path to the .xlsx file")
+    excel_import.add_argument("--output-dir", default=_path("output_json"), help="Folder for the JSON files")
+    excel_import.set_defaults(handler=cmd_import)
+
+    promote = commands.add_parser("promote", help="Merge imported section files into repo-shopify-data by ID")
+    promote.add_argument("--source-dir", default=_path("output_json"), help="Folder with the imported JSON files")
+    promote.add_argument("--target-dir", default=_path("repo-shopify-data"), help="Folder to update")
+    promote.add_argument("--prune", action="store_true",
+                         help="Also remove records missing from the import (it is a complete export)")
+    promote.add_argument("--apply-deletes", action="store_true",
+                         help="Remove objects whose imported rows have Command DELETE instead of storing those rows")
+    promote.set_defaults(handler=cmd_promote)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from metrics import RunMetrics
+
+    metrics = RunMetrics(f"sd-shopify-{args.command}")
+    status = args.handler(args, metrics)
+    metrics.finish("ok" if status == 0 else "failed")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
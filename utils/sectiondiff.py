@@ -0,0 +1,230 @@
+import os
+import json
+import hashlib
+import subprocess
+
+from recordgroups import ROW_NUMBER, row_number
+from sectionstream import iter_records
+
+# Repository root (GitHub workspace in Actions, otherwise the parent of utils/)
+GITHUB_WORKSPACE = os.getenv("GITHUB_WORKSPACE", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Folder holding one JSON file per Shopify section (Pages, Redirects, Metaobjects, ...)
+DATA_DIR = "repo-shopify-data"
+
+
+# Function to run a git command in the workspace and return its stdout
+def _git(args, workspace=GITHUB_WORKSPACE, check=True):
+    result = subprocess.run(["git", "-C", workspace] + args, capture_output=True, check=check)
+    return result.stdout if result.returncode == 0 else None
+
+
+# Function to check that a revision exists in the workspace (None, the working tree, always does)
+def revision_exists(rev, workspace=GITHUB_WORKSPACE):
+    return rev is None or _git(["rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"], workspace, check=False) is not None
+
+
+# Function to resolve a revision to its commit SHA (None for the working tree or an unknown revision)
+def commit_id(rev, workspace=GITHUB_WORKSPACE):
+    if rev is None:
+        return None
+    output = _git(["rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"], workspace, check=False)
+    return output.decode("utf-8").strip() if output else None
+
+
+# Function to list section files at a revision (rev=None reads the working tree)
+def list_sections(rev=None, workspace=GITHUB_WORKSPACE):
+    """
+    Return {section_name: path relative to the workspace} for every JSON file in repo-shopify-data.
+
+    :param rev: Git revision (e.g. 'origin/main'); None means the working tree
+    :param workspace: Repository root
+    """
+    if rev is None:
+        data_dir = os.path.join(workspace, DATA_DIR)
+        names = os.listdir(data_dir) if os.path.isdir(data_dir) else []
+    else:
+        output = _git(["ls-tree", "--name-only", f"{rev}:{DATA_DIR}"], workspace, check=False) or b""
+        names = output.decode("utf-8").splitlines()
+
+    return {
+        os.path.splitext(name)[0]: f"{DATA_DIR}/{name}"
+        for name in sorted(names)
+        if name.endswith(".json")
+    }
+
+
+# Function to get the git blob id of a section file (used to skip sections that did not change)
+def blob_id(path, rev=None, workspace=GITHUB_WORKSPACE):
+    if rev is None:
+        full_path = os.path.join(workspace, path)
+        if not os.path.exists(full_path):
+            return None
+        output = _git(["hash-object", full_path], workspace, check=False)
+    else:
+        output = _git(["rev-parse", "--verify", "--quiet", f"{rev}:{path}"], workspace, check=False)
+    return output.decode("utf-8").strip() if output else None
+
+
+# Function to stream a section's records at a revision (missing file -> no records)
+def iter_section(path, rev=None, workspace=GITHUB_WORKSPACE, ids=None, index_dir=None):
+    """
+    :param ids: Optional collection of IDs to keep (all of their rows, wherever they are in the file)
+    :param index_dir: With `ids` at a revision, keep an ID index of the blob in this folder so
+                      later reads stop after the last wanted record (see sectionindex)
+    """
+    if rev is None:
+        full_path = os.path.join(workspace, path)
+        if os.path.exists(full_path):
+            yield from iter_records(full_path, ids=ids)
+        return
+
+    blob = blob_id(path, rev, workspace)
+    if blob is None:
+        return
+    process = subprocess.Popen(["git", "-C", workspace, "show", f"{rev}:{path}"], stdout=subprocess.PIPE)
+    try:
+        if ids is not None and index_dir:
+            from sectionindex import iter_blob_records
+            yield from iter_blob_records(process.stdout, blob, ids, index_dir)
+        else:
+            yield from iter_records(process.stdout, ids=ids)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+# Function to load a section's records at a revision into a list
+def load_section(path, rev=None, workspace=GITHUB_WORKSPACE):
+    return list(iter_section(path, rev, workspace))
+
+
+# Function to hash every logical record, keyed by ID
+def record_hashes(records):
+    """
+    Hash all rows sharing an ID into a single digest in one pass over the records.
+
+    Metaobjects, Menus and Custom_Collections store one object as several rows with the
+    same ID. Each row is hashed on its own without its "Row #", and an object's digest
+    combines its row digests in Row # order. "Row #" is a running number across the whole
+    file, so inserting a row into one object no longer marks every later object as changed,
+    while reordering an object's own rows still does. Keys are sorted so that a column
+    reorder alone is not reported as a change.
+
+    :param records: Iterable of JSON records (dicts)
+    :return: Dictionary {ID: hex digest}
+    """
+    rows_by_id = {}
+    for position, record in enumerate(records):
+        number = row_number(record)
+        row = {key: value for key, value in record.items() if key != ROW_NUMBER} if ROW_NUMBER in record else record
+        row_digest = hashlib.sha1(json.dumps(row, sort_keys=True, separators=(",", ":")).encode("utf-8")).digest()
+        rows_by_id.setdefault(str(record.get("ID")), []).append((number is None, number or 0, position, row_digest))
+
+    hashes = {}
+    for record_id, rows in rows_by_id.items():
+        rows.sort()
+        hashes[record_id] = hashlib.sha1(b"".join(row[3] for row in rows)).hexdigest()
+    return hashes
+
+
+# Function to compare two {ID: hash} maps
+def diff_hashes(old_hashes, new_hashes):
+    """
+    :return: Dictionary with sorted 'added', 'removed' and 'modified' ID lists
+    """
+    return {
+        "added": sorted(record_id for record_id in new_hashes if record_id not in old_hashes),
+        "removed": sorted(record_id for record_id in old_hashes if record_id not in new_hashes),
+        "modified": sorted(
+            record_id for record_id, digest in new_hashes.items()
+            if record_id in old_hashes and old_hashes[record_id] != digest
+        ),
+    }
+
+
+# Function to get the size in bytes of a section file at a revision (0 when missing)
+def section_size(path, rev=None, workspace=GITHUB_WORKSPACE):
+    if rev is None:
+        full_path = os.path.join(workspace, path)
+        return os.path.getsize(full_path) if os.path.exists(full_path) else 0
+    output = _git(["cat-file", "-s", f"{rev}:{path}"], workspace, check=False)
+    return int(output) if output else 0
+
+
+def _counted(records, stats):
+    for record in records:
+        stats["records"] = stats.get("records", 0) + 1
+        yield record
+
+
+# Function to hash the records of a section at a revision, reusing the hashes of a known blob
+def section_record_hashes(path, rev, blob, workspace=GITHUB_WORKSPACE, hash_cache=None, stats=None):
+    """
+    :param blob: Git blob SHA of the section at `rev` (None when the file is missing)
+    :param hash_cache: Optional baseline.BaselineManifest (anything with lookup/store)
+    :param stats: Optional dictionary; 'records' and 'bytes' parsed are added to it
+    :return: Dictionary {ID: hex digest}
+    """
+    if blob is None:
+        return {}
+    if hash_cache is not None:
+        hashes = hash_cache.lookup(blob)
+        if hashes is not None:
+            return hashes
+
+    records = iter_section(path, rev, workspace)
+    if stats is not None:
+        records = _counted(records, stats)
+        stats["bytes"] = stats.get("bytes", 0) + section_size(path, rev, workspace)
+    hashes = record_hashes(records)
+
+    if hash_cache is not None:
+        hash_cache.store(blob, hashes)
+    return hashes
+
+
+# Function to diff every section between two revisions
+def diff_revisions(base_rev, head_rev=None, workspace=GITHUB_WORKSPACE, stats=None, hash_cache=None):
+    """
+    Record-level diff of repo-shopify-data between two revisions.
+
+    Sections whose git blob is identical on both sides are skipped without parsing, and with
+    a hash_cache, so is every side whose blob was hashed by an earlier run.
+
+    :param base_rev: Old revision (e.g. 'origin/main')
+    :param head_rev: New revision (e.g. 'origin/int'); None means the working tree
+    :param workspace: Repository root
+    :param stats: Optional dictionary; 'records' and 'bytes' parsed on both sides are added to it
+    :param hash_cache: Optional baseline.BaselineManifest holding record hashes by blob SHA
+    :return: Dictionary {section: {'added': [...], 'removed': [...], 'modified': [...]}}
+             containing only sections with at least one change
+    """
+    base_sections = list_sections(base_rev, workspace)
+    head_sections = list_sections(head_rev, workspace)
+
+    changes = {}
+    for section in sorted(set(base_sections) | set(head_sections)):
+        path = head_sections.get(section) or base_sections.get(section)
+
+        base_blob = blob_id(path, base_rev, workspace)
+        head_blob = blob_id(path, head_rev, workspace)
+        if base_blob == head_blob:
+            continue
+
+        old_hashes = section_record_hashes(path, base_rev, base_blob, workspace, hash_cache, stats)
+        new_hashes = section_record_hashes(path, head_rev, head_blob, workspace, hash_cache, stats)
+        section_changes = diff_hashes(old_hashes, new_hashes)
+
+        if any(section_changes.values()):
+            changes[section] = section_changes
+
+    return changes
+
+
+# Function to flatten a diff result into {section: sorted changed IDs}
+def changed_ids_by_section(changes):
+    return {
+        section: sorted(set(kinds["added"]) | set(kinds["removed"]) | set(kinds["modified"]))
+        for section, kinds in changes.items()
+    }
@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+import tempfile
+
+from sectiondiff import GITHUB_WORKSPACE
+from sectionstream import iter_records, iter_spans
+
+# Folder holding one ID -> byte range index per section file (not tracked in git)
+INDEX_DIR = os.path.join(GITHUB_WORKSPACE, ".cache", "section-index")
+
+# Bump when the index layout changes so old sidecars are rebuilt
+INDEX_VERSION = 1
+
+
+# Function to hash a file's content
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Function to write JSON atomically (temp file + rename)
+def _write_atomic(file_path, data):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Function to build the ID -> byte ranges map of a section file in one pass
+def build_index(file_path):
+    """
+    :param file_path: Path to a repo-shopify-data section file
+    :return: Dictionary {ID: [[start, end], ...]}; IDs with several rows get several ranges
+    """
+    ids = {}
+    for record, start, end in iter_spans(file_path):
+        ids.setdefault(str(record.get("ID")), []).append([start, end])
+    return ids
+
+
+# Function to load the sidecar index of a section file, rebuilding it if the file changed
+def load_index(file_path, index_dir=INDEX_DIR):
+    """
+    The sidecar is keyed by the file's SHA-256. Size and mtime are stored too so an
+    untouched file is recognised without re-hashing it.
+
+    :param file_path: Path to a repo-shopify-data section file
+    :param index_dir: Folder for the sidecar indexes
+    :return: Dictionary {ID: [[start, end], ...]}
+    """
+    index_path = os.path.join(index_dir, os.path.basename(file_path))
+    stat = os.stat(file_path)
+
+    index = None
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except ValueError:
+            index = None
+
+    if index and index.get("version") == INDEX_VERSION:
+        if index["size"] == stat.st_size and index["mtime_ns"] == stat.st_mtime_ns:
+            return index["ids"]
+
+        content_hash = file_sha256(file_path)
+        if index["sha256"] == content_hash:
+            # Same content, new mtime (e.g. after a checkout): refresh the stat fields only
+            index["size"], index["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+            _write_atomic(index_path, index)
+            return index["ids"]
+    else:
+        content_hash = file_sha256(file_path)
+
+    index = {
+        "version": INDEX_VERSION,
+        "sha256": content_hash,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "ids": build_index(file_path),
+    }
+    _write_atomic(index_path, index)
+    return index["ids"]
+
+
+# Function to read only the records with the given IDs by seeking to their byte ranges
+def read_records(file_path, ids, index_dir=INDEX_DIR):
+    """
+    :param file_path: Path to a repo-shopify-data section file
+    :param ids: Collection of IDs to read (compared as strings)
+    :param index_dir: Folder for the sidecar indexes
+    :return: List of matching records in file order
+    """
+    index = load_index(file_path, index_dir)
+
+    ranges = []
+    for record_id in {str(record_id) for record_id in ids}:
+        ranges.extend(index.get(record_id, ()))
+    ranges.sort()
+
+    records = []
+    with open(file_path, "rb") as f:
+        for start, end in ranges:
+            f.seek(start)
+            records.append(json.loads(f.read(end - start)))
+    return records
+
+
+# Function to stream the records with the given IDs out of a git blob of a section file
+def iter_blob_records(source, blob, ids, index_dir=INDEX_DIR):
+    """
+    The first read of a blob scans it whole and saves its ID index, keyed by the blob id so
+    it never goes stale. Later reads stop after the last byte range of `ids`, wherever the
+    rows of those IDs are in the file.
+
+    :param source: Binary file object with the blob's content (e.g. a `git show` pipe)
+    :param blob: Git blob id of the content
+    :param ids: Collection of IDs to keep (compared as strings)
+    :param index_dir: Folder for the sidecar indexes
+    :return: Generator of the matching records in file order
+    """
+    wanted = {str(record_id) for record_id in ids}
+    index_path = os.path.join(index_dir, "blobs", f"{blob}.json")
+
+    index = None
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except ValueError:
+            index = None
+
+    if index and index.get("version") == INDEX_VERSION:
+        ends = [end for record_id in wanted for _, end in index["ids"].get(record_id, ())]
+        yield from iter_records(source, ids=wanted, stop_after=max(ends, default=0))
+        return
+
+    ids_index = {}
+    for record, start, end in iter_spans(source):
+        record_id = str(record.get("ID"))
+        ids_index.setdefault(record_id, []).append([start, end])
+        if record_id in wanted:
+            yield record
+    _write_atomic(index_path, {"version": INDEX_VERSION, "ids": ids_index})
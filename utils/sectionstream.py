@@ -0,0 +1,156 @@
+import json
+
+# Size of each read from the section file
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+# Function to scan the top-level array of a section file one record at a time
+def iter_spans(source):
+    """
+    Yield (record, start, end) for every element of the top-level JSON array, where start/end
+    are byte offsets of the element in the file.
+
+    The file is read in chunks and decoded as latin-1 so that character offsets are byte
+    offsets; a record holding non-ASCII bytes is decoded again from its bytes as UTF-8 (like
+    sectionindex.read_records), so raw UTF-8 and escaped characters can share a record.
+
+    :param source: Path to a JSON file, or a binary file object (e.g. a `git show` pipe)
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iter_spans(f)
+        return
+
+    buffer = ""
+    buffer_offset = 0  # Byte offset of buffer[0] in the file
+    position = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, buffer_offset, position, eof
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        # Drop what has already been consumed before appending
+        buffer_offset += position
+        buffer = buffer[position:] + chunk.decode("latin-1")
+        position = 0
+        return True
+
+    while True:
+        # Skip whitespace and separators between elements
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or not fill():
+                break
+
+        if position >= len(buffer):
+            if not started:
+                return  # Empty file
+            raise ValueError("Unexpected end of section file (unterminated array)")
+
+        char = buffer[position]
+        if not started:
+            if char != "[":
+                raise ValueError("Section file must contain a top-level JSON array")
+            started = True
+            position += 1
+            continue
+        if char == "]":
+            return
+        if char == ",":
+            position += 1
+            continue
+
+        # Decode one element, reading more data until it is complete
+        while True:
+            try:
+                record, end = _decoder.raw_decode(buffer, position)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        raw = buffer[position:end]
+        if not raw.isascii():
+            # latin-1 maps every byte to one character, so this gives back the file's bytes
+            record = json.loads(raw.encode("latin-1"))
+
+        yield record, buffer_offset + position, buffer_offset + end
+        position = end
+
+
+# Function to stream records out of a section file
+def iter_records(source, ids=None, predicate=None, stop_after=None):
+    """
+    Yield records from a section file one at a time instead of loading the whole array.
+
+    With `ids`, only records whose ID is in the set are yielded. Rows of a multi-row object
+    (Metaobjects, Menus, Custom_Collections) are not guaranteed to be contiguous, so the
+    file alone never tells when the last row of an ID has gone by: reading stops early only
+    at `stop_after`, which an ID index (see sectionindex.iter_blob_records) can provide.
+
+    :param source: Path to a JSON file or a binary file object
+    :param ids: Optional collection of IDs to keep (compared as strings)
+    :param predicate: Optional callable(record) -> bool to filter records
+    :param stop_after: Byte offset after which no wanted record is stored; reading stops there
+    """
+    wanted = {str(record_id) for record_id in ids} if ids is not None else None
+
+    for record, start, _ in iter_spans(source):
+        if stop_after is not None and start >= stop_after:
+            return
+        if wanted is not None and str(record.get("ID")) not in wanted:
+            continue
+
+        if predicate is not None and not predicate(record):
+            continue
+
+        yield record
+
+
+# File-like view of a run of array elements in a section file, read back as a JSON array
+class _ElementRun:
+    def __init__(self, f, size):
+        self.f = f
+        self.left = size
+        self.opened = False
+        self.closed = False
+
+    def read(self, size):
+        if not self.opened:
+            self.opened = True
+            return b"["
+        if self.left > 0:
+            chunk = self.f.read(min(size, self.left))
+            self.left -= len(chunk)
+            if chunk:
+                return chunk
+            self.left = 0
+        if not self.closed:
+            self.closed = True
+            return b"]"
+        return b""
+
+
+# Function to stream the records stored between two byte offsets of a section file
+def iter_records_between(file_path, start, end):
+    """
+    Only that part of the file is read, e.g. a range of objects located by iter_spans.
+
+    :param file_path: Path to a JSON file
+    :param start: Byte offset where the first record starts (a start offset of iter_spans)
+    :param end: Byte offset where the last record ends (an end offset of iter_spans)
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        for record, _, _ in iter_spans(_ElementRun(f, end - start)):
+            yield record
@@ -0,0 +1,414 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import tempfile
+from array import array
+
+from recordgroups import ROW_NUMBER, row_number
+from sectiondiff import GITHUB_WORKSPACE
+from sectionindex import file_sha256
+from sectionstream import iter_records
+
+# Folder holding one columnar snapshot per section file (not tracked in git)
+SNAPSHOT_DIR = os.path.join(GITHUB_WORKSPACE, ".cache", "snapshots")
+
+# Bump when the snapshot layout changes so old snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+
+# Magic, source size, source mtime_ns, header length; the stat fields can be refreshed in place
+_MAGIC = b"SDSNAP1\n"
+_PREFIX = struct.Struct("<8sQQI")
+
+# Columns with at most this many distinct values are stored as one byte per row
+_DICT8_MAX = 256
+
+
+def _aligned(offset):
+    return (offset + 7) & ~7
+
+
+# Function to locate the snapshot of a section file (the path is hashed in, so two folders never collide)
+def snapshot_path(file_path, snapshot_dir=SNAPSHOT_DIR):
+    real_path = os.path.realpath(file_path)
+    tag = hashlib.sha1(real_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(snapshot_dir, f"{os.path.basename(file_path)}-{tag}.snap")
+
+
+# Function to convert a section file into a columnar snapshot in one pass
+def build_snapshot(file_path, output_path, content_hash=None):
+    """
+    Layout: a fixed prefix, a JSON header, then 8-byte aligned arrays:
+      - the string table: every distinct value once (NUL-separated UTF-8 + uint32 byte offsets,
+        plus one kind byte: 0 = string, 1 = JSON literal for the rare non-string value)
+      - one array per column: uint8 codes into a per-column dictionary for columns with
+        few distinct values (Command, Status, Top Row, ...), uint32 string ids otherwise
+      - one uint16 layout id per row: which columns the row has, in its original key order
+      - the ID index: (ID string id, first row, row count) per contiguous run of rows
+
+    :param file_path: Path to a section file
+    :param output_path: Path of the snapshot to write (atomically)
+    :param content_hash: SHA-256 of the section file, if already known
+    """
+    stat = os.stat(file_path)
+    content_hash = content_hash or file_sha256(file_path)
+
+    strings = {}          # (kind, text) -> string id
+    columns = {}          # column name -> column position
+    codes = []            # per column: array('I') of string ids (0 where the row lacks the column)
+    layouts = {}          # tuple of column positions -> layout id
+    row_layouts = array("H")
+    runs = array("I")
+    rows = 0
+    run_id = None
+
+    def intern(value):
+        key = (0, value) if isinstance(value, str) else (1, json.dumps(value))
+        string_id = strings.get(key)
+        if string_id is None:
+            string_id = strings[key] = len(strings)
+        return string_id
+
+    for record in iter_records(file_path):
+        layout = []
+        for key, value in record.items():
+            position = columns.get(key)
+            if position is None:
+                position = columns[key] = len(columns)
+                codes.append(array("I", bytes(4 * rows)))
+            codes[position].append(intern(value))
+            layout.append(position)
+        if len(layout) < len(columns):
+            present = set(layout)
+            for position, column in enumerate(codes):
+                if position not in present:
+                    column.append(0)
+
+        layout_id = layouts.get(tuple(layout))
+        if layout_id is None:
+            layout_id = layouts[tuple(layout)] = len(layouts)
+        row_layouts.append(layout_id)
+
+        record_id = intern(str(record.get("ID")))
+        if run_id != record_id or rows == 0:
+            runs.extend((record_id, rows, 0))
+            run_id = record_id
+        runs[-1] += 1
+        rows += 1
+
+    # NUL-separated, so a full scan decodes the table with one decode + split
+    texts = [text.encode("utf-8") for kind, text in strings]
+    string_text = b"\x00".join(texts)
+    string_offsets = array("I", [0])
+    total = 0
+    for text in texts:
+        total += len(text) + 1
+        string_offsets.append(total)
+    string_kinds = bytes(kind for kind, _ in strings)
+
+    blobs = []
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "sha256": content_hash,
+        "source": os.path.realpath(file_path),
+        "rows": rows,
+        "columns": [],
+        "layouts": [list(layout) for layout in layouts],
+    }
+
+    def add_blob(data):
+        blobs.append(data)
+        return len(blobs) - 1
+
+    header["strings"] = {
+        "count": len(texts),
+        "splittable": b"\x00" not in b"".join(texts),
+        "text": add_blob(string_text),
+        "offsets": add_blob(string_offsets.tobytes()),
+        "kinds": add_blob(string_kinds),
+    }
+    for name, position in columns.items():
+        column = codes[position]
+        distinct = sorted(set(column))
+        if len(distinct) <= _DICT8_MAX:
+            lookup = {string_id: code for code, string_id in enumerate(distinct)}
+            data = bytes(lookup[string_id] for string_id in column)
+            header["columns"].append({"name": name, "encoding": "dict8", "dictionary": distinct,
+                                      "data": add_blob(data)})
+        else:
+            header["columns"].append({"name": name, "encoding": "str32", "data": add_blob(column.tobytes())})
+    header["row_layouts"] = add_blob(row_layouts.tobytes())
+    header["runs"] = add_blob(runs.tobytes())
+
+    # Blob numbers become (offset, length) pairs relative to the start of the data area
+    offsets, position = [], 0
+    for data in blobs:
+        position = _aligned(position)
+        offsets.append([position, len(data)])
+        position += len(data)
+    header["blobs"] = offsets
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header_bytes))
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(_MAGIC, stat.st_size, stat.st_mtime_ns, len(header_bytes)))
+            f.write(header_bytes)
+            for (offset, _), data in zip(offsets, blobs):
+                f.seek(data_start + offset)
+                f.write(data)
+            f.truncate(data_start + position)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return output_path
+
+
+# Memory-mapped, read-only view of a section snapshot
+class Snapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.source_size, self.source_mtime_ns, header_length = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a section snapshot: {path}")
+        self.header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_length])
+        self._data_start = _aligned(_PREFIX.size + header_length)
+        self._values = None
+        self._strings = {}
+        self._index = None
+
+        self.rows = self.header["rows"]
+        self.columns = [column["name"] for column in self.header["columns"]]
+        self.layouts = [tuple(layout) for layout in self.header["layouts"]]
+        strings = self.header["strings"]
+        self._text = self._blob(strings["text"])
+        self._offsets = self._blob(strings["offsets"]).cast("I")
+        self._kinds = self._blob(strings["kinds"])
+        self.has_literals = 1 in self._kinds
+
+    def _blob(self, number):
+        offset, length = self.header["blobs"][number]
+        start = self._data_start + offset
+        return memoryview(self._mmap)[start:start + length]
+
+    def close(self):
+        self._values = self._index = None
+        self._strings = {}
+        self._text = self._offsets = self._kinds = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Function to decode one entry of the string table
+    def _decode(self, string_id):
+        value = str(self._text[self._offsets[string_id]:self._offsets[string_id + 1] - 1], "utf-8")
+        return json.loads(value) if self._kinds[string_id] else value
+
+    # Function to get one value by string id, decoding only what is asked for
+    def string(self, string_id):
+        if self._values is not None:
+            return self._values[string_id]
+        value = self._strings.get(string_id)
+        if value is None:
+            value = self._strings[string_id] = self._decode(string_id)
+        return value
+
+    # Whole decoded string table (built on first use, for full scans)
+    @property
+    def values(self):
+        if self._values is None:
+            if self.header["strings"]["splittable"] and not self.has_literals:
+                self._values = str(self._text, "utf-8").split("\x00") if self.header["strings"]["count"] else []
+            else:
+                self._values = [self._decode(i) for i in range(self.header["strings"]["count"])]
+            self._strings = {}
+        return self._values
+
+    # Function to get (codes, dictionary) of one column; dictionary is None when codes are string ids
+    def column_codes(self, position):
+        column = self.header["columns"][position]
+        data = self._blob(column["data"])
+        if column["encoding"] == "dict8":
+            return data, column["dictionary"]
+        return data.cast("I"), None
+
+    # Function to get the values of one column for every row (absent cells hold an arbitrary value)
+    def column_values(self, position):
+        codes, dictionary = self.column_codes(position)
+        values = self.values
+        if dictionary is not None:
+            dictionary = [values[string_id] for string_id in dictionary]
+            return [dictionary[code] for code in codes]
+        return [values[string_id] for string_id in codes]
+
+    def row_layouts(self):
+        return self._blob(self.header["row_layouts"]).cast("H")
+
+    # Dictionary {ID: [(first row, row count), ...]} built from the run table on first use
+    @property
+    def index(self):
+        if self._index is None:
+            runs = self._blob(self.header["runs"]).cast("I")
+            index = {}
+            for i in range(0, len(runs), 3):
+                index.setdefault(self.string(runs[i]), []).append((runs[i + 1], runs[i + 2]))
+            self._index = index
+        return self._index
+
+    # Function to list row numbers object by object, each object's rows in Row # order (see recordgroups.sort_rows)
+    def object_row_order(self):
+        if ROW_NUMBER not in self.columns:
+            return range(self.rows)
+        position = self.columns.index(ROW_NUMBER)
+        numbers = self.column_values(position)
+        has_number = [position in layout for layout in self.layouts]
+        row_layouts = self.row_layouts()
+        runs = self._blob(self.header["runs"]).cast("I")
+
+        order = []
+        for i in range(0, len(runs), 3):
+            start, count = runs[i + 1], runs[i + 2]
+            rows = range(start, start + count)
+            if count > 1:
+                keys = [row_number({ROW_NUMBER: numbers[row] if has_number[row_layouts[row]] else None})
+                        for row in rows]
+                rows = sorted(rows, key=lambda row: (keys[row - start] is None, keys[row - start] or 0))
+            order.extend(rows)
+        return order
+
+    # Function to stream rows as lists of values in `positions` order (None where a row lacks the column)
+    def iter_rows(self, positions, rows=None):
+        columns = [self.column_values(position) for position in positions]
+        row_layouts = self.row_layouts()
+        rows = range(self.rows) if rows is None else rows
+        if len(self.layouts) == 1 and set(positions) <= set(self.layouts[0]):
+            # Every row has every column: no per-cell presence checks
+            for row in rows:
+                yield [column[row] for column in columns]
+            return
+        present = [set(layout) for layout in self.layouts]
+        for row in rows:
+            layout = present[row_layouts[row]]
+            yield [column[row] if position in layout else None for position, column in zip(positions, columns)]
+
+    # Function to rebuild records (all of them, in file order) with their original key order
+    def iter_records(self):
+        columns = [self.column_values(position) for position in range(len(self.columns))]
+        names = self.columns
+        if len(self.layouts) == 1:
+            layout = self.layouts[0]
+            keys = [names[position] for position in layout]
+            for values in zip(*(columns[position] for position in layout)):
+                yield dict(zip(keys, values))
+            return
+        layouts = [[(names[position], columns[position]) for position in layout] for layout in self.layouts]
+        for row, layout_id in enumerate(self.row_layouts()):
+            yield {name: column[row] for name, column in layouts[layout_id]}
+
+    # Function to read only the records with the given IDs (in file order), decoding only their cells
+    def read_records(self, ids):
+        index = self.index
+        ranges = sorted(span for record_id in {str(record_id) for record_id in ids}
+                        for span in index.get(record_id, ()))
+        if not ranges:
+            return []
+        columns = [self.column_codes(position) for position in range(len(self.columns))]
+        names, layouts, row_layouts, string = self.columns, self.layouts, self.row_layouts(), self.string
+
+        def cell(position, row):
+            codes, dictionary = columns[position]
+            return string(codes[row] if dictionary is None else dictionary[codes[row]])
+
+        return [{names[position]: cell(position, row) for position in layouts[row_layouts[row]]}
+                for start, count in ranges for row in range(start, start + count)]
+
+    # Function to list the columns in the order pandas would see them when rows go out in `order`
+    def columns_in_order(self, order):
+        seen_layouts, names = set(), {}
+        row_layouts = self.row_layouts()
+        for row in order:
+            layout_id = row_layouts[row]
+            if layout_id not in seen_layouts:
+                seen_layouts.add(layout_id)
+                for position in self.layouts[layout_id]:
+                    names.setdefault(position, None)
+        return list(names)
+
+
+# Function to open the snapshot of a section file, (re)building it when it is missing or stale
+def load_snapshot(file_path, snapshot_dir=SNAPSHOT_DIR, build=True):
+    """
+    A snapshot is fresh when the section file's size and mtime match, or, after a checkout
+    touched the mtime, when its SHA-256 still matches (the stat fields are then refreshed).
+
+    :param file_path: Path to a section file (the JSON stays the source of truth)
+    :param snapshot_dir: Folder for the snapshots
+    :param build: Build the snapshot if it is missing or stale; otherwise return None
+    :return: Snapshot, or None
+    """
+    path = snapshot_path(file_path, snapshot_dir)
+    stat = os.stat(file_path)
+    content_hash = None
+
+    if os.path.exists(path):
+        try:
+            snapshot = Snapshot(path)
+        except (ValueError, OSError):
+            snapshot = None
+        if snapshot is not None:
+            header = snapshot.header
+            if header.get("version") == SNAPSHOT_VERSION and header.get("byteorder") == sys.byteorder:
+                if snapshot.source_size == stat.st_size and snapshot.source_mtime_ns == stat.st_mtime_ns:
+                    return snapshot
+                content_hash = file_sha256(file_path)
+                if header.get("sha256") == content_hash:
+                    snapshot.close()
+                    with open(path, "r+b") as f:
+                        f.write(_PREFIX.pack(_MAGIC, stat.st_size, stat.st_mtime_ns, 0)[:_PREFIX.size - 4])
+                    return Snapshot(path)
+            snapshot.close()
+
+    if not build:
+        return None
+    build_snapshot(file_path, path, content_hash)
+    return Snapshot(path)
+
+
+# Function to open a section's snapshot for reading, or None when the cache folder is not writable
+def open_snapshot(file_path, snapshot_dir=SNAPSHOT_DIR):
+    try:
+        return load_snapshot(file_path, snapshot_dir)
+    except OSError as e:
+        print(f"⚠️ No snapshot for {file_path} ({e}); reading the JSON instead.")
+        return None
+
+
+# Function to delete snapshots whose section file no longer exists (e.g. benchmark workspaces)
+def prune_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    removed = 0
+    if not os.path.isdir(snapshot_dir):
+        return removed
+    for name in os.listdir(snapshot_dir):
+        path = os.path.join(snapshot_dir, name)
+        try:
+            with Snapshot(path) as snapshot:
+                source = snapshot.header.get("source")
+        except (ValueError, OSError, struct.error):
+            source = None
+        if source is None or not os.path.exists(source):
+            os.remove(path)
+            removed += 1
+    return removed
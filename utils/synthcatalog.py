@@ -0,0 +1,150 @@
+import os
+import glob
+import random
+
+from changeset import write_json_records
+from recordgroups import ROW_NUMBER, iter_runs
+from sectiondiff import GITHUB_WORKSPACE, DATA_DIR
+from sectionstream import iter_records
+
+# Real section files the synthetic catalog copies its field layouts from
+REPO_DIR = os.path.join(GITHUB_WORKSPACE, DATA_DIR)
+
+# Fields holding a handle or path that must stay unique across copies
+UNIQUE_TEXT_FIELDS = ("Handle", "Path", "Menu Item: Resource Handle")
+
+# Fields never touched when a record is edited in a change set
+FROZEN_FIELDS = {"ID", "Handle", "Command", "Path", "Top Row", ROW_NUMBER}
+
+
+# Function to derive the ID of a record in copy N (copy 0 keeps the real ID)
+def copy_id(record_id, copy):
+    return record_id if copy == 0 or not record_id else f"{record_id}{copy:06d}"
+
+
+# Function to derive a handle, path or "type.handle" reference in copy N
+def copy_text(value, copy):
+    return value if copy == 0 or not value else f"{value}-c{copy}"
+
+
+# Function to copy one record into copy N, keeping references inside the same copy
+def copy_record(record, copy):
+    """
+    IDs, handles and redirect paths get a per-copy suffix. Page metafields that point at
+    metaobjects ("type.handle") or pages (handle) and menu items that point at resources are
+    rewritten the same way, so the copies reference each other like the real catalog does.
+    """
+    if copy == 0:
+        return dict(record)
+    copied = {}
+    for key, value in record.items():
+        if key == "ID" or key == "Menu Item: Resource ID":
+            value = copy_id(value, copy)
+        elif key in UNIQUE_TEXT_FIELDS or key.endswith("[metaobject_reference]") or key.endswith("[page_reference]"):
+            value = copy_text(value, copy)
+        copied[key] = value
+    return copied
+
+
+# Function to renumber Row # across a whole section (it is a running number in Matrixify exports)
+def renumber_rows(rows):
+    for number, row in enumerate(rows, start=1):
+        if ROW_NUMBER in row:
+            row[ROW_NUMBER] = str(number)
+        yield row
+
+
+# Function to stream the rows of a section scaled up N times
+def iter_scaled_rows(objects, scale):
+    """
+    :param objects: List of (ID, rows) of the real section, see recordgroups.iter_runs
+    :param scale: Number of copies of the section
+    :return: Generator of rows; every copy repeats all objects with fresh IDs and handles
+    """
+    for copy in range(scale):
+        for _, rows in objects:
+            for row in rows:
+                yield copy_record(row, copy)
+
+
+# Function to write a synthetic repo-shopify-data folder N times the size of the real one
+def generate_catalog(output_dir, scale, source_dir=REPO_DIR):
+    """
+    :param output_dir: Folder to write the section files into
+    :param scale: Size multiplier (10, 100, 1000, ...)
+    :param source_dir: Folder with the real section files used as templates
+    :return: Dictionary {section: {'objects': n, 'rows': n, 'bytes': n}}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summary = {}
+    for json_file in sorted(glob.glob(os.path.join(source_dir, "*.json"))):
+        section = os.path.splitext(os.path.basename(json_file))[0]
+        objects = list(iter_runs(iter_records(json_file)))
+        output_file = os.path.join(output_dir, os.path.basename(json_file))
+        rows = write_json_records(output_file, renumber_rows(iter_scaled_rows(objects, scale)))
+        summary[section] = {"objects": len(objects) * scale, "rows": rows, "bytes": os.path.getsize(output_file)}
+    return summary
+
+
+# Function to edit one object the way a developer would (change a field, sometimes add a row)
+def edit_object(rows, rng):
+    rows = [dict(row) for row in rows]
+    editable = [key for key, value in rows[0].items() if key not in FROZEN_FIELDS and isinstance(value, str)]
+    if editable:
+        key = rng.choice(editable)
+        rows[0][key] = f"{rows[0][key]} (edited)"
+    if len(rows) > 1 and rng.random() < 0.5:
+        extra = dict(rows[-1])
+        extra["Top Row"] = ""
+        rows.append(extra)
+    elif not editable:
+        rows[0]["Command"] = "REPLACE"
+    return rows
+
+
+# Function to build the "head" side of a change set from a generated catalog
+def mutate_catalog(source_dir, output_dir, fraction=0.01, seed=0):
+    """
+    Edits about `fraction` of the objects of every section, and removes and adds about a
+    fifth of that many. Multi-row objects may also gain a row. Row # is renumbered.
+
+    :param source_dir: Folder with the base section files
+    :param output_dir: Folder to write the changed section files into
+    :param fraction: Share of objects to edit
+    :param seed: Random seed (the same seed gives the same change set)
+    :return: Dictionary {section: {'added': set, 'removed': set, 'modified': set}} of the
+             changes the pipeline is expected to find
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    expected = {}
+
+    for json_file in sorted(glob.glob(os.path.join(source_dir, "*.json"))):
+        section = os.path.splitext(os.path.basename(json_file))[0]
+        changes = expected[section] = {"added": set(), "removed": set(), "modified": set()}
+
+        def rows():
+            for record_id, object_rows in iter_runs(iter_records(json_file)):
+                roll = rng.random()
+                if roll < fraction / 5:
+                    changes["removed"].add(record_id)
+                    continue
+                if roll < fraction:
+                    changes["modified"].add(record_id)
+                    object_rows = edit_object(object_rows, rng)
+                yield from object_rows
+
+                if rng.random() < fraction / 5:
+                    new_id = f"{record_id}-new"
+                    changes["added"].add(new_id)
+                    for row in object_rows:
+                        row = dict(row, ID=new_id)
+                        if row.get("Handle"):
+                            row["Handle"] = f"{row['Handle']}-new"
+                        if row.get("Path"):
+                            row["Path"] = f"{row['Path']}-new"
+                        yield row
+
+        write_json_records(os.path.join(output_dir, os.path.basename(json_file)), renumber_rows(rows()))
+
+    return expected
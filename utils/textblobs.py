@@ -0,0 +1,121 @@
+import os
+import time
+import hashlib
+import tempfile
+from functools import lru_cache
+
+from sectiondiff import GITHUB_WORKSPACE
+
+# Folder holding each distinct large text value once, named by its SHA-256 (not tracked in git)
+BLOB_DIR = os.path.join(GITHUB_WORKSPACE, ".cache", "text-blobs")
+
+# Columns whose values can be large (page and collection bodies, file URLs)
+BLOB_FIELDS = ("Body HTML", "Link")
+
+# Shorter values stay in the record: a reference is 72 characters
+MIN_BLOB_CHARS = 512
+
+# Start of a reference. Shopify text never holds NUL (an Excel cell cannot), so no real value looks like one
+REF_PREFIX = "\x00sha256:"
+
+# Blobs unused for this long are removed by prune_blobs
+KEEP_DAYS = 30
+
+# Blobs this process already wrote or refreshed, as (blob_dir, digest)
+_STORED = set()
+
+
+# Function to check whether a cell value is a blob reference
+def is_ref(value):
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+# Function to locate the blob of a digest (two-character fan-out, like .git/objects)
+def blob_path(digest, blob_dir=BLOB_DIR):
+    return os.path.join(blob_dir, digest[:2], digest)
+
+
+# Function to store a text once and get the reference standing in for it
+def store_text(text, blob_dir=BLOB_DIR):
+    """
+    A blob that already exists is not written again, only its mtime is refreshed (once per
+    process) so prune_blobs keeps it.
+
+    :return: Reference, e.g. "\\x00sha256:9f86d0..."
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    if (blob_dir, digest) not in _STORED:
+        path = blob_path(digest, blob_dir)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(text.encode("utf-8"))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        _STORED.add((blob_dir, digest))
+    return REF_PREFIX + digest
+
+
+# Function to get the text behind a reference (the last few are kept in memory)
+@lru_cache(maxsize=256)
+def load_text(ref, blob_dir=BLOB_DIR):
+    with open(blob_path(ref[len(REF_PREFIX):], blob_dir), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+# Function to replace the large text fields of records with blob references
+def intern_records(records, blob_dir=BLOB_DIR):
+    """
+    Records are changed in place as they stream by. Equal texts get equal references, so
+    later stages compare, hash and copy 72 characters instead of the whole body.
+
+    :param records: Iterable of records (dicts)
+    :return: Generator of the same records
+    """
+    for record in records:
+        for field in BLOB_FIELDS:
+            value = record.get(field)
+            if isinstance(value, str) and len(value) >= MIN_BLOB_CHARS:
+                record[field] = store_text(value, blob_dir)
+        yield record
+
+
+# Function to put the texts back into records holding blob references (at write time)
+def inline_records(records, blob_dir=BLOB_DIR):
+    """
+    :param records: Iterable of records, with or without references
+    :return: Generator of records; a record holding a reference is copied, the others are
+             passed through untouched
+    """
+    for record in records:
+        refs = [field for field in BLOB_FIELDS if is_ref(record.get(field))]
+        if refs:
+            record = dict(record)
+            for field in refs:
+                record[field] = load_text(record[field], blob_dir)
+        yield record
+
+
+# Function to delete blobs no run has used for `keep_days`
+def prune_blobs(blob_dir=BLOB_DIR, keep_days=KEEP_DAYS):
+    removed = 0
+    if not os.path.isdir(blob_dir):
+        return removed
+    cutoff = time.time() - keep_days * 86400
+    for fan_out in os.listdir(blob_dir):
+        folder = os.path.join(blob_dir, fan_out)
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                _STORED.discard((blob_dir, name))
+                removed += 1
+    return removed
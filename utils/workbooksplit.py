@@ -0,0 +1,214 @@
+import os
+import glob
+import json
+import hashlib
+from datetime import datetime
+
+from excelexport import BUILD_KEY_PROPERTY, column_kinds, row_renderer, sheet_name_for, write_rows
+from recordgroups import iter_object_rows
+from sectionstream import iter_records, iter_records_between, iter_spans
+
+# Data rows one worksheet can hold (Excel's 1,048,576 rows, minus the header)
+MAX_SHEET_ROWS = 1_048_575
+
+# Name of the manifest written next to the workbooks of a split export
+MANIFEST_NAME = "manifest.json"
+
+
+# Function to measure the objects of a section and where they are in the file
+def section_objects(json_file):
+    """
+    Multi-row objects (Metaobjects, Menus, Custom_Collections) are the consecutive rows
+    sharing an ID; single-row sections have one row per object. The first pass collects the
+    columns and their types, the second renders each row once to measure it and notes the
+    byte range of each object, so a workbook later reads only its own part of the file.
+
+    :return: ([(column, kind), ...] as in excelexport.column_kinds,
+              list of (ID, rows, text bytes, start byte, end byte) in file order)
+    :raises ValueError: When the rows of an ID are not contiguous (the objects would overlap)
+    """
+    columns = list(column_kinds(iter_object_rows(iter_records(json_file))).items())
+    names = [name for name, _ in columns]
+    id_position = names.index("ID") if "ID" in names else None
+    render = row_renderer(columns)
+
+    objects = []
+    seen_ids = set()
+    for record, start, end in iter_spans(json_file):
+        row = render(record)
+        record_id = row[id_position] if id_position is not None else None
+        size = sum(len(value.encode("utf-8")) if isinstance(value, str) else len(str(value))
+                   for value in row if value is not None)
+        if objects and id_position is not None and objects[-1][0] == record_id:
+            objects[-1][1] += 1
+            objects[-1][2] += size
+            objects[-1][4] = end
+            continue
+        if id_position is not None:
+            if record_id in seen_ids:
+                raise ValueError(f"{sheet_name_for(json_file)} {record_id}: rows are not contiguous in {json_file}, "
+                                 "move them together before a split export")
+            seen_ids.add(record_id)
+        objects.append([record_id, 1, size, start, end])
+    return columns, [tuple(item) for item in objects]
+
+
+# Function to pack the objects of every section into workbooks that stay under the limits
+def plan_parts(sections, max_rows=MAX_SHEET_ROWS, max_bytes=None):
+    """
+    Objects keep their order and are never split across workbooks; a workbook is closed as
+    soon as the next object would take it over a limit. Several small sections can share a
+    workbook (one sheet each).
+
+    :param sections: Iterable of (sheet_name, json_file)
+    :param max_rows: Data rows per workbook (capped at what one sheet can hold)
+    :param max_bytes: Cell text per workbook in bytes (None = no limit)
+    :return: List of parts; a part is a dictionary with 'rows', 'bytes', 'objects' and
+             'sheets' [{sheet, json_file, columns, start, stop, byte_start, byte_stop,
+             objects, first_id, last_id}, ...]
+    """
+    max_rows = min(max_rows or MAX_SHEET_ROWS, MAX_SHEET_ROWS)
+    parts = []
+    current = None
+    for sheet_name, json_file in sections:
+        columns, objects = section_objects(json_file)
+        row = 0
+        for record_id, rows, size, byte_start, byte_stop in objects:
+            if rows > max_rows:
+                raise ValueError(f"{sheet_name} {record_id}: {rows} rows do not fit in one workbook (limit {max_rows})")
+            if current is None or (current["objects"] and (current["rows"] + rows > max_rows or
+                                                          (max_bytes and current["bytes"] + size > max_bytes))):
+                current = {"rows": 0, "bytes": 0, "objects": 0, "sheets": []}
+                parts.append(current)
+            if max_bytes and size > max_bytes:
+                print(f"⚠️ {sheet_name} {record_id}: {size:,} bytes of text alone exceed the limit of {max_bytes:,}")
+
+            sheets = current["sheets"]
+            if not sheets or sheets[-1]["json_file"] != json_file:
+                sheets.append({"sheet": sheet_name, "json_file": json_file, "columns": columns,
+                               "start": row, "stop": row, "byte_start": byte_start, "byte_stop": byte_stop,
+                               "objects": 0, "first_id": record_id, "last_id": record_id})
+            sheet = sheets[-1]
+            sheet["stop"] += rows
+            sheet["byte_stop"] = byte_stop
+            sheet["objects"] += 1
+            sheet["last_id"] = record_id
+            current["rows"] += rows
+            current["bytes"] += size
+            current["objects"] += 1
+            row += rows
+    return parts
+
+
+# Function to render the rows of one planned sheet (header first) from its byte range of the section file
+def sheet_rows(sheet):
+    columns = sheet["columns"]
+    yield [name for name, _ in columns]
+    render = row_renderer(columns)
+    for record in iter_object_rows(iter_records_between(sheet["json_file"], sheet["byte_start"], sheet["byte_stop"])):
+        yield render(record)
+
+
+# Function to write one planned workbook (runs in a worker process with workers > 1)
+def write_part(job):
+    """
+    Each sheet reads only the records of its own objects, with the columns planned for the
+    whole section, so writing all parts reads every section file once.
+
+    :param job: (part, output_excel_file, build_key)
+    :return: (output_excel_file, file size, sha256)
+    """
+    import xlsxwriter
+
+    part, output_excel_file, build_key = job
+    workbook = xlsxwriter.Workbook(output_excel_file, {"constant_memory": True})
+    try:
+        if build_key:
+            workbook.set_custom_property(BUILD_KEY_PROPERTY, build_key)
+        for sheet in part["sheets"]:
+            worksheet = workbook.add_worksheet(sheet["sheet"][:31])
+            write_rows(worksheet, sheet_rows(sheet))
+    finally:
+        workbook.close()
+
+    digest = hashlib.sha256()
+    with open(output_excel_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return output_excel_file, os.path.getsize(output_excel_file), digest.hexdigest()
+
+
+# Function to find a split export in a folder that was built from the same input and limits
+def find_split_export(output_folder, key):
+    for manifest_file in sorted(glob.glob(os.path.join(output_folder, "Export_*", MANIFEST_NAME)), reverse=True):
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                if json.load(f).get("build_key") == key:
+                    return manifest_file
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+# Function to export section files into size-limited workbooks plus a manifest
+def split_export(json_files, output_folder, max_rows=None, max_mb=None, workers=1, build_key=None):
+    """
+    The workbooks go into <output_folder>/Export_<timestamp>/ as Export_<timestamp>_partNN.xlsx
+    next to manifest.json, which lists every workbook with its sheets, row ranges, first and
+    last IDs, size and SHA-256. The workbooks do not depend on each other, so they can be
+    imported in parallel.
+
+    :param json_files: Section files, in sheet order
+    :param output_folder: Folder receiving the export folder
+    :param max_rows: Data rows per workbook (default and cap: one full sheet)
+    :param max_mb: Cell text per workbook in MB (the .xlsx itself is smaller, it is zipped)
+    :param workers: Write the workbooks in this many processes
+    :param build_key: Stored in the manifest and each workbook (see buildcache)
+    :return: Path of the manifest
+    """
+    max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+    parts = plan_parts(((sheet_name_for(json_file), json_file) for json_file in json_files), max_rows, max_bytes)
+
+    current_time = datetime.now().strftime('%Y-%m-%d_%H%M%S')
+    export_dir = os.path.join(output_folder, f"Export_{current_time}")
+    os.makedirs(export_dir, exist_ok=True)
+    jobs = [(part, os.path.join(export_dir, f"Export_{current_time}_part{number:02d}.xlsx"), build_key)
+            for number, part in enumerate(parts, start=1)]
+
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            written = list(pool.map(write_part, jobs))
+    else:
+        written = [write_part(job) for job in jobs]
+
+    manifest = {
+        "created": current_time,
+        "build_key": build_key,
+        "limits": {"max_rows": min(max_rows or MAX_SHEET_ROWS, MAX_SHEET_ROWS), "max_mb": max_mb},
+        "workbooks": [
+            {
+                "file": os.path.basename(excel_file),
+                "rows": part["rows"],
+                "objects": part["objects"],
+                "text_bytes": part["bytes"],
+                "bytes": size,
+                "sha256": sha256,
+                "sheets": [
+                    {"sheet": sheet["sheet"][:31], "rows": sheet["stop"] - sheet["start"], "objects": sheet["objects"],
+                     "first_id": sheet["first_id"], "last_id": sheet["last_id"]}
+                    for sheet in part["sheets"]
+                ],
+            }
+            for (part, _, _), (excel_file, size, sha256) in zip(jobs, written)
+        ],
+    }
+    manifest_file = os.path.join(export_dir, MANIFEST_NAME)
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+    for workbook in manifest["workbooks"]:
+        sheets = ", ".join(f"{sheet['sheet']} {sheet['rows']}" for sheet in workbook["sheets"])
+        print(f"📦 {workbook['file']}: {workbook['rows']:,} rows, {workbook['bytes'] / 1024:,.0f} KB ({sheets})")
+    return manifest_file